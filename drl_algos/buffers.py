@@ -1,8 +1,14 @@
 from abc import abstractmethod
 import numpy as np
 from numpy import ndarray
+from pathlib import Path
+import tempfile
+import threading
 import torch
 from torch import Tensor
+from typing import IO
+from typing import Iterator
+from typing import Optional
 from typing import TypeVar
 
 ActionType = TypeVar("ActionType")
@@ -16,6 +22,12 @@ class RolloutBuffer4IPPO:
     Since RolloutBufferForMAPPO is for independent PPO algorithm, the buffer store experiences of all agents.
 
     An experience consists of (obs, action, reward, next_obs, done, log_prob).
+    .append(), .append_all_agents(), .append_batch() and .get() are guarded by a lock
+    so that experiences can be collected and consumed by different threads.
+    Since next_obs of a step is obs of the following step, observations are stored in
+    one obs_stream whose length is buffer_size+1. obses and next_obses are its shifted views.
+    All storage is laid out as (num_agents, buffer_size, ...) so that an experience of one agent
+    is written to a contiguous row and .get() returns experiences in the same axis order.
     """
     def __init__(
         self,
@@ -23,7 +35,11 @@ class RolloutBuffer4IPPO:
         num_agents: int,
         obs_shape: tuple[int],
         action_shape: tuple[int],
-        device: torch.device
+        device: torch.device,
+        memmap_threshold: Optional[int] = None,
+        memmap_dir: Optional[Path] = None,
+        obs_dtype: torch.dtype = torch.float,
+        double_buffer: bool = False
     ) -> None:
         """Initialize RolloutBufferForMAPPO.
 
@@ -33,54 +49,134 @@ class RolloutBuffer4IPPO:
             action_shape (tuple[int]): Action shape.
             num_agents (int): Number of agents.
             device (torch.device): Device.
+            memmap_threshold (int, optional): If bytes of obs_stream exceed this threshold, obs_stream is
+                stored in a memory-mapped file and kept on host memory. Memory-mapping is disabled if None.
+                Defaults to None.
+            memmap_dir (Path, optional): Directory to create memory-mapped files in. The system temporary
+                directory is used if None, which may be a small tmpfs. Files are removed by .close().
+                Defaults to None.
+            obs_dtype (torch.dtype): dtype to store observations. torch.bfloat16 halves the memory and
+                the transfer of obs_stream. Observations must be cast back to float32 before they are
+                fed to networks. actions, rewards, dones and log_probs are always stored in float32
+                since actions are clamped close to ±1 and log probabilities need precision.
+                Defaults to torch.float.
+            double_buffer (bool): If True, two sets of storage are allocated and used alternately so that
+                experiences returned by .get() are not overwritten by the next rollout. This doubles
+                the memory of the buffer. Defaults to False.
         """
         self.buffer_size: int = int(buffer_size)
         self.num_agents: int = int(num_agents)
-        self.obs_shape: tuple[int] = obs_shape
-        self.action_shape: tuple[int] = action_shape
-        self.device: torch.device = device
+        self.obs_shape: tuple[int] = tuple(obs_shape)
+        self.action_shape: tuple[int] = tuple(action_shape)
+        self.device: torch.device = torch.device(device)
+        self.pin_memory: bool = self.device.type == "cuda"
+        self.obs_dtype: torch.dtype = obs_dtype
+        self.double_buffer: bool = double_buffer
+        obs_bytes: int = obs_dtype.itemsize * self.num_agents * (self.buffer_size+1) * int(np.prod(self.obs_shape))
+        self.is_memmapped: bool = memmap_threshold is not None and memmap_threshold < obs_bytes
+        self.memmap_dir: Optional[Path] = memmap_dir
+        self._memmap_files: list[IO[bytes]] = []
+        self._lock: threading.Lock = threading.Lock()
+        self._write_event: Optional[torch.cuda.Event] = (
+            torch.cuda.Event() if self.pin_memory else None
+        )
+        self._allocate_buffer()
         self.initialize_buffer()
 
     def initialize_buffer(self) -> None:
         """Initialize buffer.
         
+        Storage allocated by ._allocate_buffer() is reused. Only the pointers of all agents are reset.
+        """
+        self._reset_pointers()
+
+    def _reset_pointers(self) -> None:
+        """Reset storing flags and next indices of all agents."""
+        self.is_storing: ndarray = np.ones(self.num_agents, dtype=bool)
+        self.next_idx: ndarray = np.zeros(self.num_agents, dtype=np.int64)
+
+    def _allocate_buffer(self) -> None:
+        """Allocate buffer.
+
         RolloutBuffer4IPPO stores rollout experiences of all agents.
+        Experiences are staged on host memory so that .append() does not issue
+        small host-to-device transfers. obs_stream and actions are allocated
+        in pinned memory if device is cuda. rewards, dones and log_probs are stored as ndarray.
+        This method is called only once in .__init__() and the storage is reused over rollouts.
+        If self.is_memmapped, obs_stream is stored in a memory-mapped file instead.
+
+        If self.double_buffer, two sets of storage are allocated and used alternately (ping-pong).
+        While experiences returned by .get() are read from one set, .append() writes the next rollout
+        into the other set.
         """
-        self.is_storing_dic: dict[int, bool] = {
-            agent_idx: True for agent_idx in range(self.num_agents)
-        }
-        self.next_idx_dic: dict[int, int] = {
-            agent_idx: 0 for agent_idx in range(self.num_agents)
+        num_sets: int = 2 if self.double_buffer else 1
+        self._buffers: list[dict[str, Tensor | ndarray]] = [
+            self._allocate_buffer_set() for _ in range(num_sets)
+        ]
+        self._transfer_events: list[Optional[torch.cuda.Event]] = [None] * num_sets
+        self._write_idx: int = 0
+        self._read_idx: int = 0
+        self._bind_buffer_set(self._write_idx)
+
+    def _allocate_buffer_set(self) -> dict[str, Tensor | ndarray]:
+        """Allocate one set of storage.
+
+        rewards, dones and log_probs are ndarray scratchpads on which .append() stores
+        python scalars directly. If device is cuda, the scratchpads share pinned memory
+        with tensors so that each of them is transferred by one non-blocking copy in .get().
+        """
+        buffer_set: dict[str, Tensor | ndarray] = {
+            "obs_stream": self._allocate_obs_storage(),
+            "actions": torch.empty(
+                (self.num_agents, self.buffer_size, *self.action_shape),
+                dtype=torch.float, pin_memory=self.pin_memory
+            )
         }
-        self.obses: Tensor = torch.empty(
-            (self.num_agents, self.buffer_size, *self.obs_shape),
-            dtype=torch.float, device=self.device
-        )
-        self.actions: Tensor = torch.empty(
-            (self.num_agents, self.buffer_size, *self.action_shape),
-            dtype=torch.float, device=self.device
-        )
-        self.rewards: Tensor = torch.empty(
-            (self.num_agents, self.buffer_size, 1),
-            dtype=torch.float, device=self.device
-        )
-        self.rewards: Tensor = torch.empty(
-            (self.num_agents, self.buffer_size, 1),
-            dtype=torch.float, device=self.device
-        )
-        self.dones: Tensor = torch.empty(
-            (self.num_agents, self.buffer_size, 1),
-            dtype=torch.float, device=self.device
-        )
-        self.log_probs: Tensor = torch.empty(
-            (self.num_agents, self.buffer_size, 1),
-            dtype=torch.float, device=self.device
-        )
-        self.next_obses: Tensor = torch.empty(
-            (self.num_agents, self.buffer_size, *self.obs_shape),
-            dtype=torch.float, device=self.device
-        )
+        for name in ["rewards", "dones", "log_probs"]:
+            buffer_set[name] = torch.empty(
+                (self.num_agents, self.buffer_size, 1),
+                dtype=torch.float, pin_memory=self.pin_memory
+            ).numpy()
+        return buffer_set
+
+    def _bind_buffer_set(self, buffer_idx: int) -> None:
+        """Let .append() write into the buffer_idx-th set of storage."""
+        buffer_set: dict[str, Tensor | ndarray] = self._buffers[buffer_idx]
+        self.obs_stream: Tensor = buffer_set["obs_stream"]
+        self.actions: Tensor = buffer_set["actions"]
+        self.rewards: ndarray = buffer_set["rewards"]
+        self.dones: ndarray = buffer_set["dones"]
+        self.log_probs: ndarray = buffer_set["log_probs"]
+
+    def _wait_transfer(self) -> None:
+        """Wait for the transfers from the set of storage being written issued by .get().
+
+        This is called by .append() methods before the staging memory is overwritten, so that .get()
+        does not have to block until its non-blocking transfers are completed.
+        """
+        transfer_event: Optional[torch.cuda.Event] = self._transfer_events[self._write_idx]
+        if transfer_event is not None:
+            transfer_event.synchronize()
+            self._transfer_events[self._write_idx] = None
+
+    def close(self) -> None:
+        """Remove memory-mapped files. The buffer must not be used afterwards."""
+        for memmap_file in self._memmap_files:
+            memmap_file.close()
+        self._memmap_files = []
+
+    def _allocate_obs_storage(self) -> Tensor:
+        """Allocate storage for obs_stream."""
+        shape: tuple[int] = (self.num_agents, self.buffer_size+1, *self.obs_shape)
+        if not self.is_memmapped:
+            return torch.empty(shape, dtype=self.obs_dtype, pin_memory=self.pin_memory)
+        memmap_file = tempfile.NamedTemporaryFile(suffix=".bin", dir=self.memmap_dir)
+        self._memmap_files.append(memmap_file)
+        return torch.from_file(
+            memmap_file.name, shared=True, size=int(np.prod(shape)), dtype=self.obs_dtype
+        ).view(shape)
 
+    @torch.no_grad()
     def append(
         self,
         agent_idx: int,
@@ -94,26 +190,232 @@ class RolloutBuffer4IPPO:
         
         RolloutBuffer4IPPO synchronously stores experiences of all agents. In other words,
         .append() method will not append filled agents' experiences to the buffer until all buffer will be filled.
-        
+
+        obs_tensor and action_tensor are copied with non_blocking=True. The copies are queued on
+        the current stream before the transfers in .get(), so they are completed by then.
+        Pass pinned host tensors (tensor.pin_memory()) to overlap the copies with the next env step.
+
+        obs_tensor must be shaped as obs_shape or (1, *obs_shape), and action_tensor as
+        action_shape or (1, *action_shape). They are copied without reshaping.
+        They are detached so that the buffer never retains autograd graphs of the policy.
         """
-        next_idx: int = self.next_idx_dic[agent_idx]
-        is_storing: bool = self.is_storing_dic[agent_idx]
-        if not is_storing:
-            return
-        else:
-            self.rewards[agent_idx, next_idx-1] = float(reward)
-            self.next_obses[agent_idx, next_idx-1].copy_(
-                obs_tensor.view(self.obs_shape)
+        obs_tensor = obs_tensor.detach()
+        action_tensor = action_tensor.detach()
+        with self._lock:
+            next_idx: int = int(self.next_idx[agent_idx])
+            if not self.is_storing[agent_idx]:
+                return
+            self._wait_transfer()
+            assert obs_tensor.shape[-len(self.obs_shape):] == self.obs_shape
+            assert action_tensor.shape[-len(self.action_shape):] == self.action_shape
+            self.obs_stream[agent_idx, next_idx:next_idx+1].copy_(obs_tensor, non_blocking=True)
+            self.rewards[agent_idx, next_idx-1] = reward
+            if next_idx == self.buffer_size:
+                self.is_storing[agent_idx] = False
+                self._record_write()
+                return
+            self.actions[agent_idx, next_idx:next_idx+1].copy_(action_tensor, non_blocking=True)
+            self._record_write()
+            #self.rewards[agent_idx, next_idx] = float(reward)
+            self.dones[agent_idx, next_idx] = done
+            self.log_probs[agent_idx, next_idx] = float(log_prob)
+            self.next_idx[agent_idx] = next_idx + 1
+
+    @torch.no_grad()
+    def append_all_agents(
+        self,
+        obs_tensor: Tensor,
+        action_tensor: Tensor,
+        rewards: ndarray | Tensor,
+        dones: ndarray | Tensor,
+        log_probs: ndarray | Tensor
+    ) -> None:
+        """add one experience of every agent to buffer at once.
+
+        This is a batched version of .append() for the case that all agents step synchronously.
+        All agents must be storing experiences at the same index.
+
+        Args:
+            obs_tensor (Tensor): Observations of all agents. (num_agents, *obs_shape)
+            action_tensor (Tensor): Actions of all agents. (num_agents, *action_shape)
+            rewards (ndarray | Tensor): Rewards of all agents. (num_agents,)
+            dones (ndarray | Tensor): Done flags of all agents. (num_agents,)
+            log_probs (ndarray | Tensor): Log probabilities of all agents. (num_agents,)
+        """
+        obs_tensor = obs_tensor.detach()
+        action_tensor = action_tensor.detach()
+        with self._lock:
+            next_idx: int = int(self.next_idx[0])
+            if not self.is_storing.all() or (self.next_idx != next_idx).any():
+                raise ValueError(
+                    "all agents must be storing experiences at the same index to use .append_all_agents()."
+                )
+            self._wait_transfer()
+            self.obs_stream[:, next_idx].copy_(
+                obs_tensor.view((self.num_agents, *self.obs_shape)), non_blocking=True
             )
+            self.rewards[:, next_idx-1, 0] = self._to_ndarray(rewards)
             if next_idx == self.buffer_size:
-                self.is_storing_dic[agent_idx] = False
+                self.is_storing[:] = False
+                self._record_write()
                 return
-        self.obses[agent_idx, next_idx].copy_(obs_tensor.view(self.obs_shape))
-        self.actions[agent_idx, next_idx].copy_(action_tensor.view(self.action_shape))
-        #self.rewards[agent_idx, next_idx] = float(reward)
-        self.dones[agent_idx, next_idx] = float(done)
-        self.log_probs[agent_idx, next_idx] = float(log_prob)
-        self.next_idx_dic[agent_idx] = next_idx + 1
+            self.actions[:, next_idx].copy_(
+                action_tensor.view((self.num_agents, *self.action_shape)), non_blocking=True
+            )
+            self._record_write()
+            self.dones[:, next_idx, 0] = self._to_ndarray(dones)
+            self.log_probs[:, next_idx, 0] = self._to_ndarray(log_probs)
+            self.next_idx[:] = next_idx + 1
+
+    @torch.no_grad()
+    def append_batch(
+        self,
+        agent_indices: ndarray | list[int],
+        obs_tensor: Tensor,
+        action_tensor: Tensor,
+        rewards: ndarray | Tensor,
+        dones: ndarray | Tensor,
+        log_probs: ndarray | Tensor
+    ) -> None:
+        """add one experience of each given agent to buffer at once.
+
+        This is a batched version of .append() without any per-agent branch.
+        Unlike .append_all_agents(), agents may be storing experiences at different indices.
+        Experiences of agents whose buffers are already filled are ignored as in .append().
+
+        Args:
+            agent_indices (ndarray | list[int]): Indices of agents. Each index must appear at most once.
+            obs_tensor (Tensor): Observations. (len(agent_indices), *obs_shape)
+            action_tensor (Tensor): Actions. (len(agent_indices), *action_shape)
+            rewards (ndarray | Tensor): Rewards. (len(agent_indices),)
+            dones (ndarray | Tensor): Done flags. (len(agent_indices),)
+            log_probs (ndarray | Tensor): Log probabilities. (len(agent_indices),)
+        """
+        obs_tensor = obs_tensor.detach()
+        action_tensor = action_tensor.detach()
+        with self._lock:
+            self._wait_transfer()
+            agent_indices = np.asarray(agent_indices, dtype=np.int64)
+            storing_mask: ndarray = self.is_storing[agent_indices]
+            agent_indices = agent_indices[storing_mask]
+            next_indices: ndarray = self.next_idx[agent_indices]
+            obs_tensor = obs_tensor.view((-1, *self.obs_shape)).to(self.obs_stream.device)
+            action_tensor = action_tensor.view((-1, *self.action_shape)).to(self.actions.device)
+            self.obs_stream[agent_indices, next_indices] = obs_tensor[storing_mask].to(self.obs_dtype)
+            self.rewards[agent_indices, next_indices-1, 0] = self._to_ndarray(rewards)[storing_mask]
+            filled_mask: ndarray = next_indices == self.buffer_size
+            self.is_storing[agent_indices[filled_mask]] = False
+            storing_mask[storing_mask] = ~filled_mask
+            agent_indices = agent_indices[~filled_mask]
+            next_indices = next_indices[~filled_mask]
+            self.actions[agent_indices, next_indices] = action_tensor[storing_mask]
+            self.dones[agent_indices, next_indices, 0] = self._to_ndarray(dones)[storing_mask]
+            self.log_probs[agent_indices, next_indices, 0] = self._to_ndarray(log_probs)[storing_mask]
+            self.next_idx[agent_indices] = next_indices + 1
+
+    def _record_write(self) -> None:
+        """Record the non-blocking copies issued so far so that .get() can wait for them.
+
+        .get() may be called from another thread whose current stream differs from that of .append().
+        """
+        if self._write_event is not None:
+            self._write_event.record()
+
+    def _to_ndarray(self, values: ndarray | Tensor) -> ndarray:
+        """Convert per-agent scalars to 1 dimensional ndarray."""
+        if isinstance(values, Tensor):
+            values = values.detach().cpu().numpy()
+        return np.asarray(values, dtype=np.float32).reshape(-1)
+
+    def _to_device(self, experience: Tensor) -> Tensor:
+        """Transfer staged experience to self.device with one bulk copy."""
+        return experience.to(self.device, non_blocking=True)
+
+    def _gather(
+        self,
+        storage: Tensor,
+        indices: Optional[Tensor],
+        pin_memory: bool
+    ) -> Tensor:
+        """Gather experiences of filled agents on host memory.
+
+        If indices is None, storage itself is returned without copying. Otherwise, rows are gathered
+        into a new tensor so that only experiences of filled agents are transferred to self.device.
+        """
+        if indices is None:
+            return storage
+        gathered: Tensor = torch.empty(
+            (len(indices), *storage.shape[1:]), dtype=storage.dtype, pin_memory=pin_memory
+        )
+        return torch.index_select(storage, 0, indices, out=gathered)
+
+    def _transfer(self, storage: Tensor, indices: Optional[Tensor]) -> Tensor:
+        """Gather experiences of filled agents and transfer them to self.device.
+
+        If the storage is already on self.device, .to() returns the storage itself.
+        It is cloned in that case so that returned experiences are not overwritten by .append().
+        """
+        experience: Tensor = self._gather(storage, indices, self.pin_memory)
+        if indices is None and experience.device == self.device:
+            return experience.clone()
+        return self._to_device(experience)
+
+    def sample_batch(
+        self,
+        agent_idx: int,
+        indices: ndarray | Tensor
+    ) -> tuple[Tensor, Tensor]:
+        """Gather obses and next_obses of one agent at given indices to self.device.
+
+        Experiences are gathered from the set of storage returned by the last .get().
+        Unless self.double_buffer, call this before the following .append() calls overwrite the set.
+
+        Args:
+            agent_idx (int): Agent index.
+            indices (ndarray | Tensor): Indices of experiences.
+
+        Returns:
+            obses (Tensor): (len(indices), *obs_shape)
+            next_obses (Tensor): (len(indices), *obs_shape)
+        """
+        indices = torch.as_tensor(indices, dtype=torch.long)
+        obs_stream: Tensor = self._buffers[self._read_idx]["obs_stream"]
+        obses: Tensor = obs_stream[agent_idx].index_select(0, indices)
+        next_obses: Tensor = obs_stream[agent_idx].index_select(0, indices+1)
+        return obses.to(self.device), next_obses.to(self.device)
+
+    @staticmethod
+    def iter_minibatches(
+        experiences: tuple[Tensor],
+        batch_size: int,
+        num_epochs: int = 1
+    ) -> Iterator[tuple[Tensor]]:
+        """Iterate shuffled minibatches of experiences.
+
+        Indices are permuted by torch.randperm on the device of experiences once per epoch and each
+        minibatch is gathered by .index_select(). experiences may be the ones returned by .get()
+        flattened to (num_agents*buffer_size, ...) by .flatten(0, 1), or those of one agent
+        with extra tensors such as advantages.
+
+        Args:
+            experiences (tuple[Tensor]): Tensors whose first dimensions have the same length.
+            batch_size (int): Mini-batch size. The last minibatch of an epoch may be smaller.
+            num_epochs (int): Number of passes over experiences. Defaults to 1.
+
+        Yields:
+            minibatch (tuple[Tensor]): Minibatch of each tensor in experiences.
+        """
+        num_experiences: int = len(experiences[0])
+        assert all(len(experience) == num_experiences for experience in experiences)
+        device: torch.device = experiences[0].device
+        for _ in range(num_epochs):
+            perm: Tensor = torch.randperm(num_experiences, device=device)
+            for start in range(0, num_experiences, batch_size):
+                sub_indices: Tensor = perm[start:start+batch_size]
+                yield tuple(
+                    experience.index_select(0, sub_indices.to(experience.device))
+                    for experience in experiences
+                )
 
     def is_filled(self) -> bool:
         """Check if the buffer is filled.
@@ -121,29 +423,65 @@ class RolloutBuffer4IPPO:
         Returns:
             bool: If the buffer is filled.
         """
-        return not all(self.is_storing_dic.values())
+        return not self.is_storing.all()
 
+    @torch.no_grad()
     def get(self) -> tuple[Tensor]:
         """Get all experiences.
         
+        Experiences of filled agents are gathered on host memory first and each field is transferred
+        to self.device by one non-blocking copy. The pointers of filled agents are reset afterwards
+        without reallocating the buffer. Memory-mapped obs_stream is not transferred to self.device.
+        Use .sample_batch() or move obses of each agent to self.device when they are used.
+        If all agents are filled, memory-mapped obses and next_obses are views of the storage. They are
+        valid until the following .append() calls overwrite them, or until the second following
+        .get() if self.double_buffer. Other returned tensors never share memory with the storage.
+
+        If all agents are filled, the storage is transferred without gathering. If self.double_buffer,
+        the sets of storage are swapped so that following .append() calls do not overwrite them.
+        Otherwise, the other agents continue to store experiences in the same set.
+        Transfers are not waited for here. Following .append() calls wait for them before
+        the staging memory is overwritten.
+
+        Returned tensors are detached, since storing tensors with autograd graphs in a buffer
+        keeps the graphs alive and multiplies memory usage.
+
         Returns:
             experiences (tuple[Tensor]): All experiences.
         """
-        filled_indices: ndarray = np.where(
-            np.array(list(self.is_storing_dic.values())) == False
-        )[0]
-        normed_rewards: Tensor = self.rewards[filled_indices] / (self.rewards[filled_indices].std() + 1e-06)
-        #print(f"{normed_rewards.quantile(0.01):.4f}, {normed_rewards.quantile(0.05):.4f} {normed_rewards.quantile(0.95):.4f}, {normed_rewards.quantile(0.99):.4f}")
-        normed_rewards = normed_rewards.clamp(-5, 5)
-        experiences: tuple[Tensor] = (
-            self.obses[filled_indices],
-            self.actions[filled_indices],
-            normed_rewards,
-            self.dones[filled_indices],
-            self.log_probs[filled_indices],
-            self.next_obses[filled_indices]
-        )
-        for agent_idx in filled_indices:
-            self.is_storing_dic[agent_idx] = True
-            self.next_idx_dic[agent_idx] = 0
-        return experiences
+        with self._lock:
+            if self._write_event is not None:
+                self._write_event.synchronize()
+            filled_indices: ndarray = np.where(~self.is_storing)[0]
+            is_all_filled: bool = len(filled_indices) == self.num_agents
+            gather_indices: Optional[Tensor] = (
+                None if is_all_filled else torch.from_numpy(filled_indices)
+            )
+            obs_stream: Tensor = (
+                self._gather(self.obs_stream, gather_indices, False) if self.is_memmapped
+                else self._transfer(self.obs_stream, gather_indices)
+            )
+            actions, rewards, dones, log_probs = [
+                self._transfer(storage, gather_indices)
+                for storage in [
+                    self.actions, torch.from_numpy(self.rewards),
+                    torch.from_numpy(self.dones), torch.from_numpy(self.log_probs)
+                ]
+            ]
+            normed_rewards: Tensor = rewards / (rewards.std() + 1e-06)
+            #print(f"{normed_rewards.quantile(0.01):.4f}, {normed_rewards.quantile(0.05):.4f} {normed_rewards.quantile(0.95):.4f}, {normed_rewards.quantile(0.99):.4f}")
+            normed_rewards = normed_rewards.clamp(-5, 5)
+            experiences: tuple[Tensor] = (
+                obs_stream[:, :-1], actions, normed_rewards, dones, log_probs, obs_stream[:, 1:]
+            )
+            self._read_idx = self._write_idx
+            if self.pin_memory and is_all_filled:
+                # storage transferred without gathering is overwritten by following .append() calls.
+                self._transfer_events[self._read_idx] = torch.cuda.Event()
+                self._transfer_events[self._read_idx].record()
+            if is_all_filled and self.double_buffer:
+                self._write_idx = 1 - self._write_idx
+                self._bind_buffer_set(self._write_idx)
+            self.is_storing[filled_indices] = True
+            self.next_idx[filled_indices] = 0
+            return tuple(experience.detach() for experience in experiences)
@@ -159,6 +159,10 @@ class IPPO(Algorithm):
         clip_eps: float = 0.2,
         lmd: float = 0.95,
         max_grad_norm: float = 0.5,
+        obs_dtype: torch.dtype = torch.float,
+        memmap_threshold: Optional[int] = None,
+        memmap_dir: Optional[Path] = None,
+        double_buffer: bool = False,
         display_process: bool = True
     ) -> None:
         """initialization.
@@ -184,6 +188,13 @@ class IPPO(Algorithm):
                 in Generalized Advantage Estimation (GAE) . Defaults to 0.97.
             max_grad_norm (float): Threshold to clip the norm of the gradient.
                 Gradient clipping is used to avoid exploding gradients. Defaults to 0.5.
+            obs_dtype (torch.dtype): dtype to store observations in the buffer. Observations are cast to
+                float32 when the rollout is processed. Defaults to torch.float.
+            memmap_threshold (int, optional): If bytes of observations in the buffer exceed this threshold,
+                they are stored in a memory-mapped file. Disabled if None. Defaults to None.
+            memmap_dir (Path, optional): Directory to create the memory-mapped file in. Defaults to None.
+            double_buffer (bool): If True, the buffer allocates two sets of storage so that the next rollout
+                can be stored while the previous one is used. Defaults to False.
         """
         super(IPPO, self).__init__(device=device)
         np.random.seed(seed)
@@ -196,7 +207,9 @@ class IPPO(Algorithm):
         self.buffer: RolloutBuffer4IPPO = RolloutBuffer4IPPO(
             buffer_size=rollout_length, num_agents=num_agents,
             obs_shape=obs_shape, action_shape=action_shape,
-            device=self.device
+            device=self.device, obs_dtype=obs_dtype,
+            memmap_threshold=memmap_threshold, memmap_dir=memmap_dir,
+            double_buffer=double_buffer
         )
         self.actor: IPPOActor = IPPOActor(obs_shape, action_shape, self.device)
         self.critic: IPPOCritic = IPPOCritic(obs_shape, self.device)
@@ -287,6 +300,8 @@ class IPPO(Algorithm):
             obses_all, actions_all, rewards_all, dones_all, log_probs_old_all, next_obses_all
         ):
             assert buffer_size == len(obses)
+            obses = obses.to(self.device, torch.float)
+            next_obses = next_obses.to(self.device, torch.float)
             with torch.no_grad():
                 values: Tensor = self.critic(obses)
                 next_values: Tensor = self.critic(next_obses)
@@ -301,16 +316,16 @@ class IPPO(Algorithm):
                     values, rewards, dones, next_values, self.gamma, self.lmd
                 )
             for _ in range(self.num_updates_per_rollout):
-                indices: np.ndarray = np.arange(self.rollout_length)
-                np.random.shuffle(indices)
-                for start in range(0, self.rollout_length, self.batch_size):
-                    sub_indices = indices[start:start+self.batch_size]
-                    self.update_critic(obses[sub_indices], targets[sub_indices])
+                for obses_mb, actions_mb, log_probs_old_mb, advantages_mb, targets_mb in \
+                    self.buffer.iter_minibatches(
+                        (obses, actions, log_probs_old, advantages, targets), self.batch_size
+                    ):
+                    self.update_critic(obses_mb, targets_mb)
                     self.update_actor(
-                        obses[sub_indices],
-                        actions[sub_indices],
-                        log_probs_old[sub_indices],
-                        advantages[sub_indices]
+                        obses_mb,
+                        actions_mb,
+                        log_probs_old_mb,
+                        advantages_mb
                     )
                 self.scheduler_actor.step()
                 self.scheduler_critic.step()
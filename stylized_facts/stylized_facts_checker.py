@@ -1,3 +1,7 @@
+from collections import deque
+from concurrent.futures import Future
+from concurrent.futures import ThreadPoolExecutor
+import csv
 import datetime
 import matplotlib.dates as mdates
 import matplotlib.pyplot as plt
@@ -5,6 +9,7 @@ from matplotlib.pyplot import Axes
 from matplotlib.pyplot import Figure
 import numpy as np
 from numpy import ndarray
+import os
 import pandas as pd
 from pandas import DataFrame
 from pandas import Timestamp
@@ -13,12 +18,18 @@ import random
 from rich.console import Console
 from rich.table import Table
 from scipy.stats import linregress
-from scipy.stats import kurtosis
-from scipy.stats import kurtosistest
+from scipy.stats import norm
 from tslearn.metrics import cdist_dtw
 from tqdm import tqdm
+from typing import Iterator
 from typing import Optional
 import warnings
+try:
+    import pyarrow as pa
+    import pyarrow.csv as pa_csv
+except ImportError:
+    pa = None
+    pa_csv = None
 plt.rcParams["font.size"] = 12
 
 bybit_freq_ohlcv_size_dic: dict[str, int] = {
@@ -58,7 +69,11 @@ class StylizedFactsChecker:
         session2_start_time_str: Optional[str] = None,
         transactions_folder_path: Optional[Path] = None,
         session1_transactions_file_name: Optional[str] = None,
-        session2_transactions_file_name: Optional[str] = None
+        session2_transactions_file_name: Optional[str] = None,
+        fast_io: bool = False,
+        save_format: str = "csv",
+        return_dtype: type = np.float64,
+        csv_float_format: Optional[str] = None
     ) -> None:
         """initialization.
 
@@ -79,6 +94,17 @@ class StylizedFactsChecker:
             figs_save_path (Optional[Path]): path to save figures.
             session1_end_time_str (Optional[str]):
             session2_start_time_str (Optional[str]):
+            fast_io (bool): whether to parse csvs with multithreaded pyarrow engine. pyarrow is required.
+                Default to False.
+            save_format (str): file format of preprocessed dfs saved in ohlcv_dfs_save_path. "csv" or "parquet".
+                Parquet files are read much faster than csvs but pyarrow is required. Default to "csv".
+            return_dtype (type): dtype of return arrays used to check stylized facts. Log returns are
+                calculated in float64 and then cast to this dtype. np.float32 halves memory traffic of
+                the checks, whose sampling errors are far larger than float32 rounding errors.
+                Default to np.float64.
+            csv_float_format (Optional[str]): format of floats in saved csvs. Ex: "%.6g".
+                Shorter formats write csvs faster but lose precision. Full precision if None.
+                Default to None.
         """
         self.prng = random.Random(seed)
         self.is_real: bool = is_real
@@ -103,6 +129,26 @@ class StylizedFactsChecker:
         self.session1_transactions_file_name: Optional[str] = session1_transactions_file_name
         self.session2_transactions_file_name: Optional[str] = session2_transactions_file_name
         self.min_executions: int = 0
+        self._bin_index_cache: dict[tuple[Timestamp, Timestamp, str], pd.DatetimeIndex] = {}
+        self._transactions_df_cache: dict[str, DataFrame] = {}
+        self._session_slice_cache: dict[str, tuple[pd.Index, slice | ndarray]] = {}
+        self._stacked_arr_cache: dict[str, ndarray] = {}
+        self._stacked_dfs: tuple[DataFrame, ...] = ()
+        self._scratch_arr_dic: dict[str, ndarray] = {}
+        if fast_io and pa is None:
+            warnings.warn("pyarrow is not installed. csvs are parsed by the default engine.")
+            fast_io = False
+        self.fast_io: bool = fast_io
+        if save_format not in ["csv", "parquet"]:
+            raise ValueError(
+                f"save_format must be 'csv' or 'parquet', but got {save_format}."
+            )
+        if save_format == "parquet" and pa is None:
+            warnings.warn("pyarrow is not installed. dfs are saved as csvs.")
+            save_format = "csv"
+        self.save_format: str = save_format
+        self.return_dtype: type = return_dtype
+        self.csv_float_format: Optional[str] = csv_float_format
         if tick_dfs_path is not None:
             print("read tick dfs")
             self._read_tick_dfs(tick_dfs_path)
@@ -118,60 +164,170 @@ class StylizedFactsChecker:
             print("read OHLCV dfs")
             self._read_ohlcv_dfs(ohlcv_dfs_path, choose_full_size_df)
         print("preprocess dfs")
-        for df, csv_name in tqdm(zip(self.ohlcv_dfs, self.ohlcv_csv_names)):
-            self.preprocess_ohlcv_df(df)
-            if ohlcv_dfs_save_path is not None:
-                save_path: Path = ohlcv_dfs_save_path / csv_name
-                df.to_csv(str(save_path))
+        # dfs are independent and both numpy operations and file writes release the GIL.
+        with ThreadPoolExecutor() as executor:
+            list(
+                tqdm(
+                    executor.map(
+                        lambda df, csv_name: self._preprocess_and_save_ohlcv_df(
+                            df, csv_name, ohlcv_dfs_save_path
+                        ),
+                        self.ohlcv_dfs, self.ohlcv_csv_names
+                    ),
+                    total=len(self.ohlcv_dfs)
+                )
+            )
         if figs_save_path is not None:
             if not figs_save_path.exists():
                 figs_save_path.mkdir(parents=True)
         self.figs_save_path: Optional[Path] = figs_save_path
         self.return_arr: Optional[ndarray] = None
+        self.abs_return_arr: Optional[ndarray] = None
         self.volume_arr: Optional[ndarray] = None
         self.abs_hill_index: Optional[float] = None
 
+    def _preprocess_and_save_ohlcv_df(
+        self,
+        df: DataFrame,
+        csv_name: str,
+        ohlcv_dfs_save_path: Optional[Path]
+    ) -> None:
+        """preprocess 1 ohlcv dataframe in place and save it if ohlcv_dfs_save_path is specified."""
+        self.preprocess_ohlcv_df(df)
+        if ohlcv_dfs_save_path is not None:
+            save_path: Path = ohlcv_dfs_save_path / csv_name
+            # files of the other format saved by previous runs are kept. the newer one is read.
+            if self.save_format == "parquet":
+                df.to_parquet(save_path.with_suffix(".parquet"), compression="zstd")
+            else:
+                self._to_csv(df, save_path.with_suffix(".csv"))
+
+    def _to_csv(
+        self,
+        df: DataFrame,
+        save_path: Path
+    ) -> None:
+        """save dataframe as csv with self.csv_float_format, writing rows in large chunks."""
+        df.to_csv(
+            str(save_path), float_format=self.csv_float_format,
+            lineterminator="\n", chunksize=65536
+        )
+
     def _read_csvs(
         self,
         csvs_path: Path,
         need_resample: bool,
         resample_mid: bool = False,
-        choose_full_size_df: bool = False
+        choose_full_size_df: bool = False,
+        read_parquet: bool = False
     ) -> tuple[list[DataFrame], list[str]]:
         """read all csv files in given folder path.
 
         Args:
             csvs_path (Path): folder path to be searched for target csvs.
             need_resample (bool): whether resampling is needed. If True, all target csvs must be tick data.
+            read_parquet (bool): whether to also read parquet files saved by save_format="parquet".
+                If both a csv and a parquet file of the same name exist, the newer one is read.
+                Default to False.
         """
         dfs: list[DataFrame] = []
         csv_names: list[str] = []
-        for csv_path in tqdm(sorted(csvs_path.rglob("*.csv"))):
-            store_df: bool = True
-            csv_name: str = csv_path.name
-            if self.specific_name is not None:
-                if self.specific_name not in csv_name:
-                    continue
-            df: DataFrame = pd.read_csv(csv_path, index_col=0)
-            if need_resample:
-                try:
-                    df = self._resample(df, resample_mid)
-                except Exception as e:
-                    print(f"resample failed. csv_name: {csv_name}")
-                    print(e)
-                    store_df = False
-            if store_df and choose_full_size_df:
-                if len(df) < self.freq_ohlcv_size_dic[self.resample_rule]:
-                    store_df = False
-                elif "num_events" in df.columns:
-                    if df["num_events"].sum() < self.min_executions:
-                        print(f"dataframe discarded. len(df): {df['num_events'].sum()}")
+        csv_paths: list[Path] = [
+            csv_path for csv_path in sorted(
+                [*csvs_path.rglob("*.csv"), *(csvs_path.rglob("*.parquet") if read_parquet else [])]
+            )
+            if self.specific_name is None or self.specific_name in csv_path.name
+        ]
+        if read_parquet:
+            csv_paths = [
+                csv_path for csv_path in csv_paths
+                if not self._is_outdated(csv_path)
+            ]
+        # csvs are parsed in parallel threads, while resampling is done sequentially in order
+        # since it consumes self.prng and may set session times.
+        max_workers: int = os.cpu_count() or 1
+        with ThreadPoolExecutor(max_workers=max_workers) as executor:
+            read_dfs: Iterator[DataFrame] = self._iter_read_dfs(
+                executor, csv_paths, max_workers
+            )
+            for csv_path, df in tqdm(zip(csv_paths, read_dfs), total=len(csv_paths)):
+                store_df: bool = True
+                csv_name: str = csv_path.name
+                if need_resample:
+                    try:
+                        df = self._resample(df, resample_mid)
+                    except Exception as e:
+                        print(f"resample failed. csv_name: {csv_name}")
+                        print(e)
+                        store_df = False
+                if store_df and choose_full_size_df:
+                    if len(df) < self.freq_ohlcv_size_dic[self.resample_rule]:
                         store_df = False
-            if store_df:
-                csv_names.append(csv_name)
-                dfs.append(df)
+                    elif "num_events" in df.columns:
+                        if df["num_events"].sum() < self.min_executions:
+                            print(f"dataframe discarded. len(df): {df['num_events'].sum()}")
+                            store_df = False
+                if store_df:
+                    csv_names.append(csv_name)
+                    dfs.append(df)
         return dfs, csv_names
 
+    def _iter_read_dfs(
+        self,
+        executor: ThreadPoolExecutor,
+        csv_paths: list[Path],
+        max_workers: int
+    ) -> Iterator[DataFrame]:
+        """read csvs in parallel threads and yield dataframes in order.
+
+        Unlike executor.map, which submits all reads up front, at most max_workers reads
+        are in flight so that dataframes not consumed yet are not piled up in memory.
+        """
+        futures: deque[Future] = deque()
+        for csv_path in csv_paths:
+            if max_workers <= len(futures):
+                yield futures.popleft().result()
+            futures.append(executor.submit(self._read_csv, csv_path))
+        while 0 < len(futures):
+            yield futures.popleft().result()
+
+    def _is_outdated(self, csv_path: Path) -> bool:
+        """check if the file of the other format with the same name is newer than csv_path."""
+        other_path: Path = csv_path.with_suffix(".csv" if csv_path.suffix == ".parquet" else ".parquet")
+        if not other_path.exists():
+            return False
+        return csv_path.stat().st_mtime < other_path.stat().st_mtime or \
+            (csv_path.stat().st_mtime == other_path.stat().st_mtime and csv_path.suffix == ".csv")
+
+    def _read_csv(self, csv_path: Path) -> DataFrame:
+        """read 1 csv file whose first column is the index.
+
+        If self.fast_io is True, the csv is parsed by multithreaded pyarrow csv reader in 1MB blocks. The index is read as strings
+        as the default engine does, since pyarrow converts "HH:MM:SS" to time objects.
+        Time-of-day indexes of parquet files are also converted to strings so that they are
+        interchangeable with csvs.
+        """
+        if csv_path.suffix == ".parquet":
+            df: DataFrame = pd.read_parquet(csv_path)
+            if pd.api.types.infer_dtype(df.index, skipna=True) == "time":
+                df.index = df.index.astype(str)
+            return df
+        if not self.fast_io:
+            return pd.read_csv(csv_path, index_col=0)
+        with open(csv_path, newline="") as f:
+            index_name: str = next(csv.reader(f))[0]
+        table: pa.Table = pa_csv.read_csv(
+            csv_path,
+            read_options=pa_csv.ReadOptions(use_threads=True, block_size=1<<20),
+            convert_options=pa_csv.ConvertOptions(column_types={index_name: pa.string()})
+        )
+        df: DataFrame = table.to_pandas(
+            self_destruct=True, split_blocks=True
+        ).set_index(index_name)
+        if index_name == "":
+            df.index.name = None
+        return df
+
     def _resample(self, df: DataFrame, resample_mid: bool) -> DataFrame:
         """resample tick data to OHLCV data.
 
@@ -192,15 +348,26 @@ class StylizedFactsChecker:
             raise ValueError(
                 f"{price_column} is not in df.columns. Maybe resample_mid is not set correctly."
             )
-        resampled_df: DataFrame = df[price_column].resample(
-            rule=self.resample_rule, closed="left", label="left"
-        ).ohlc()
-        resampled_df["volume"] = df["event_volume"].resample(
-            rule=self.resample_rule, closed="left", label="left"
-        ).apply("sum")
-        resampled_df["num_events"] = df["event_volume"].resample(
-            rule=self.resample_rule, closed="left", label="left"
-        ).count()
+        bin_keys: pd.DatetimeIndex = df.index.floor(self.resample_rule)
+        resampled_df: DataFrame = df.groupby(bin_keys, sort=False).agg(
+            open=(price_column, "first"),
+            high=(price_column, "max"),
+            low=(price_column, "min"),
+            close=(price_column, "last"),
+            volume=("event_volume", "sum"),
+            num_events=("event_volume", "count")
+        )
+        # tick dfs of different days share the same intraday bins.
+        bin_index_key: tuple[Timestamp, Timestamp, str] = (
+            bin_keys.min(), bin_keys.max(), self.resample_rule
+        )
+        if bin_index_key not in self._bin_index_cache:
+            self._bin_index_cache[bin_index_key] = pd.date_range(
+                bin_keys.min(), bin_keys.max(), freq=self.resample_rule
+            )
+        resampled_df = resampled_df.reindex(self._bin_index_cache[bin_index_key])
+        resampled_df["volume"] = resampled_df["volume"].fillna(0).astype(df["event_volume"].dtype)
+        resampled_df["num_events"] = resampled_df["num_events"].fillna(0).astype(np.int64)
         resampled_df.index = resampled_df.index.time
         resampled_df["close"] = resampled_df["close"].ffill().bfill()
         assert self.session1_end_time is not None
@@ -223,28 +390,40 @@ class StylizedFactsChecker:
             session1_df, self.session1_transactions_file_name, resample_mid
         )
         if self.session1_end_time is None:
-            self.session1_end_time = pd.to_datetime(
-                session1_resampled_df.index[-1]
-            ).time()
+            self.session1_end_time = session1_resampled_df.index[-1]
         session2_df: DataFrame = df[df["session_id"] == 2]
         session2_resampled_df: Optional[DataFrame] = self._resample_art_per_session(
             session2_df, self.session2_transactions_file_name, resample_mid
         )
         if session2_resampled_df is not None:
             if self.session2_start_time is None:
-                self.session2_start_time = pd.to_datetime(
-                    session2_resampled_df.index[0]
-                ).time()
+                self.session2_start_time = session2_resampled_df.index[0]
             resampled_df: DataFrame = pd.concat(
                 [session1_resampled_df, session2_resampled_df], axis=0
             )
         else:
             resampled_df = session1_resampled_df
-        resampled_df.index = pd.to_datetime(resampled_df.index, format="%H:%M:%S")
-        resampled_df.index = resampled_df.index.time
         resampled_df["close"] = resampled_df["close"].ffill().bfill()
         return resampled_df
 
+    def _read_transactions_df(self, transactions_file_name: str) -> DataFrame:
+        """read cumulative scaled transactions csv.
+
+        The csv is shared by all artificial tick dfs. Therefore, it is read, filled and
+        its index is converted to time only once per file.
+        """
+        if transactions_file_name not in self._transactions_df_cache:
+            transactions_file_path: Path = self.transactions_folder_path / transactions_file_name
+            cumsum_scaled_transactions_df: DataFrame = pd.read_csv(
+                str(transactions_file_path), index_col=0
+            )
+            cumsum_scaled_transactions_df = cumsum_scaled_transactions_df.ffill().bfill()
+            cumsum_scaled_transactions_df.index = pd.to_datetime(
+                cumsum_scaled_transactions_df.index, format="%H:%M:%S"
+            ).time
+            self._transactions_df_cache[transactions_file_name] = cumsum_scaled_transactions_df
+        return self._transactions_df_cache[transactions_file_name]
+
     def _resample_art_per_session(
         self,
         df: DataFrame,
@@ -257,54 +436,60 @@ class StylizedFactsChecker:
             transactions_file_name is None
         ):
             return None
-        transactions_file_path: Path = self.transactions_folder_path / transactions_file_name
-        cumsum_scaled_transactions_df: DataFrame = pd.read_csv(
-            str(transactions_file_path), index_col=0
-        )
-        cumsum_scaled_transactions_df = cumsum_scaled_transactions_df.ffill().bfill()
+        cumsum_scaled_transactions_df: DataFrame = self._read_transactions_df(transactions_file_name)
         indexes = cumsum_scaled_transactions_df.index
         sampled_column: str = self.prng.choice(list(cumsum_scaled_transactions_df.columns))
         cumsum_scaled_transactions_arr: ndarray = cumsum_scaled_transactions_df[sampled_column].values
         cumsum_transactions_arr: ndarray = len(df) * cumsum_scaled_transactions_arr
-        cumsum_transactions: list[int] = list(cumsum_transactions_arr.astype(int))
-        opens: list[Optional[float | int]] = []
-        highes: list[Optional[float | int]] = []
-        lowes: list[Optional[float | int]] = []
-        closes: list[float | int] = []
-        volumes: list[int] = []
-        num_events: list[int] = []
-        moods: list[float] = []
-        wc_rates: list[float] = []
-        time_window_sizes: list[int] = []
-        num_pre_transactions: int = 0
+        ends: ndarray = np.clip(cumsum_transactions_arr.astype(np.int64), 0, len(df))
+        starts: ndarray = np.concatenate([[0], ends[:-1]])
+        lengths: ndarray = np.maximum(ends - starts, 0)
+        is_nonempty: ndarray = 0 < lengths
+        # ufunc.reduceat over interleaved (start, end) pairs reduces each [start, end) segment.
+        # a dummy element is appended so that end == len(df) is a valid index.
+        segment_indices: ndarray = np.stack(
+            [starts[is_nonempty], ends[is_nonempty]], axis=1
+        ).ravel()
         price_column: str = "mid_price" if resample_mid else "market_price"
-        for num_cur_transactions in cumsum_transactions:
-            cur_df: DataFrame = df.iloc[num_pre_transactions:num_cur_transactions,:]
-            if 0 < len(cur_df):
-                opens.append(cur_df[price_column].iloc[0])
-                highes.append(cur_df[price_column].max())
-                lowes.append(cur_df[price_column].min())
-                closes.append(cur_df[price_column].iloc[-1])
-                volumes.append(cur_df["event_volume"].sum())
-                num_events.append(len(cur_df))
-                if "mood" in cur_df.columns:
-                    moods.append(cur_df["mood"].mean())
-                if "wc_rate" in cur_df.columns:
-                    wc_rates.append(cur_df["wc_rate"].median())
-                    time_window_sizes.append(cur_df["time_window_size"].median())
-            else:
-                opens.append(None)
-                highes.append(None)
-                lowes.append(None)
-                closes.append(None)
-                volumes.append(0)
-                num_events.append(0)
-                if "mood" in cur_df.columns:
-                    moods.append(None)
-                if "wc_rate" in cur_df.columns:
-                    wc_rates.append(None)
-                    time_window_sizes.append(None)
-            num_pre_transactions = num_cur_transactions
+        prices: ndarray = df[price_column].to_numpy()
+        event_volumes: ndarray = df["event_volume"].to_numpy()
+        opens: ndarray = np.full(len(ends), np.nan)
+        highes: ndarray = np.full(len(ends), np.nan)
+        lowes: ndarray = np.full(len(ends), np.nan)
+        closes: ndarray = np.full(len(ends), np.nan)
+        volumes: ndarray = np.zeros(len(ends), dtype=event_volumes.dtype)
+        num_events: ndarray = lengths
+        moods: ndarray = np.empty(0)
+        wc_rates: ndarray = np.empty(0)
+        time_window_sizes: ndarray = np.empty(0)
+        padded_prices: ndarray = np.append(prices, 0)
+        opens[is_nonempty] = prices[starts[is_nonempty]]
+        highes[is_nonempty] = np.maximum.reduceat(padded_prices, segment_indices)[::2]
+        lowes[is_nonempty] = np.minimum.reduceat(padded_prices, segment_indices)[::2]
+        closes[is_nonempty] = prices[ends[is_nonempty]-1]
+        volumes[is_nonempty] = np.add.reduceat(
+            np.append(event_volumes, 0), segment_indices
+        )[::2]
+        if "mood" in df.columns:
+            # NaN moods are skipped as Series.mean() does. bins without valid moods become NaN.
+            mood_arr: ndarray = np.append(df["mood"].to_numpy(dtype=np.float64), 0)
+            is_valid_mood: ndarray = ~np.isnan(mood_arr)
+            moods = np.full(len(ends), np.nan)
+            with np.errstate(invalid="ignore", divide="ignore"):
+                moods[is_nonempty] = np.add.reduceat(
+                    np.where(is_valid_mood, mood_arr, 0.0), segment_indices
+                )[::2] / np.add.reduceat(is_valid_mood.astype(np.int64), segment_indices)[::2]
+        if "wc_rate" in df.columns:
+            # medians cannot be reduced by ufunc.reduceat. gather rows of all bins and group them.
+            bin_labels: ndarray = np.repeat(np.arange(len(ends)), lengths)
+            positions: ndarray = np.arange(len(bin_labels)) - np.repeat(
+                np.cumsum(lengths) - lengths - starts, lengths
+            )
+            medians_df: DataFrame = df[["wc_rate", "time_window_size"]].iloc[positions].groupby(
+                bin_labels
+            ).median().reindex(np.arange(len(ends)))
+            wc_rates = medians_df["wc_rate"].to_numpy()
+            time_window_sizes = medians_df["time_window_size"].to_numpy()
         session_resampled_df: DataFrame = pd.DataFrame(
             data={
                 "open": opens, "high": highes, "low": lowes, "close": closes,
@@ -334,7 +519,8 @@ class StylizedFactsChecker:
         self.ohlcv_dfs, self.ohlcv_csv_names = self._read_csvs(
             ohlcv_dfs_path,
             need_resample=False,
-            choose_full_size_df=choose_full_size_df
+            choose_full_size_df=choose_full_size_df,
+            read_parquet=True
         )
 
     def preprocess_ohlcv_df(
@@ -355,37 +541,30 @@ class StylizedFactsChecker:
         Returns:
             DataFrame: _description_
         """
+        self._stacked_arr_cache.clear()
         df.columns = df.columns.str.lower()
         if not "scaled_volume" in df.columns:
             df["scaled_volume"] = df["volume"] / df["volume"].sum()
         if not "scaled_num_events" in df.columns:
             df["scaled_num_events"] = df["num_events"] / df["num_events"].sum()
         if self.session1_end_time is not None:
-            if not "session1_scaled_volume" in df.columns:
-                df["session1_scaled_volume"] = np.zeros(len(df))
-                df.loc[
-                    df.index <= self.session1_end_time, ["session1_scaled_volume"]
-                ] = df["scaled_volume"][df.index <= self.session1_end_time]
-                df["session1_scaled_volume"] = df["session1_scaled_volume"] / df["session1_scaled_volume"].sum()
-            if not "session1_scaled_num_events" in df.columns:
-                df["session1_scaled_num_events"] = np.zeros(len(df))
-                df.loc[
-                    df.index <= self.session1_end_time, ["session1_scaled_num_events"]
-                ] = df["scaled_num_events"][df.index <= self.session1_end_time]
-                df["session1_scaled_num_events"] = df["session1_scaled_num_events"] / df["session1_scaled_num_events"].sum()
+            # the mask is computed only if a session column is missing, since dfs read back from
+            # saved csvs already have the columns and their index is not comparable with time.
+            is_session1: Optional[ndarray] = None
+            for colname in ["volume", "num_events"]:
+                if not f"session1_scaled_{colname}" in df.columns:
+                    if is_session1 is None:
+                        is_session1 = np.asarray(df.index <= self.session1_end_time)
+                    session_arr: ndarray = np.where(is_session1, df[f"scaled_{colname}"].to_numpy(), 0.0)
+                    df[f"session1_scaled_{colname}"] = session_arr / np.nansum(session_arr)
         if self.session2_start_time is not None:
-            if not "session2_scaled_volume" in df.columns:
-                df["session2_scaled_volume"] = np.zeros(len(df))
-                df.loc[
-                    self.session2_start_time <= df.index, ["session2_scaled_volume"]
-                ] = df["scaled_volume"][self.session2_start_time <= df.index]
-                df["session2_scaled_volume"] = df["session2_scaled_volume"] / df["session2_scaled_volume"].sum()
-            if not "session2_scaled_num_events" in df.columns:
-                df["session2_scaled_num_events"] = np.zeros(len(df))
-                df.loc[
-                    self.session2_start_time <= df.index, ["session2_scaled_num_events"]
-                ] = df["scaled_num_events"][self.session2_start_time <= df.index]
-                df["session2_scaled_num_events"] = df["session2_scaled_num_events"] / df["session2_scaled_num_events"].sum()
+            is_session2: Optional[ndarray] = None
+            for colname in ["volume", "num_events"]:
+                if not f"session2_scaled_{colname}" in df.columns:
+                    if is_session2 is None:
+                        is_session2 = np.asarray(self.session2_start_time <= df.index)
+                    session_arr: ndarray = np.where(is_session2, df[f"scaled_{colname}"].to_numpy(), 0.0)
+                    df[f"session2_scaled_{colname}"] = session_arr / np.nansum(session_arr)
         return df
 
     def _is_stacking_possible(
@@ -404,15 +583,31 @@ class StylizedFactsChecker:
             dfs (list[DataFrame]): list whose elements are dataframe. Ex: self.ohlcv_dfs
             colname (str): column name to check if stacking is possible.
         """
-        for df in dfs:
-            if colname not in df.columns:
-                return False
-        if [len(df) for df in dfs].count(len(dfs[0])) != len(dfs):
+        if dfs is self.ohlcv_dfs and self._get_stacked_ohlcv_arr(colname) is not None:
+            return True
+        if any(colname not in df.columns for df in dfs):
+            return False
+        if len({len(df) for df in dfs}) != 1:
             return False
-        if [df[colname].isnull().sum() for df in dfs].count(dfs[0][colname].isnull().sum()) != len(dfs):
+        if len({df[colname].isnull().sum() for df in dfs}) != 1:
             return False
         return True
 
+    def _get_stacked_ohlcv_arr(self, colname: str) -> Optional[ndarray]:
+        """get memoized stacked column of self.ohlcv_dfs if any.
+
+        Columns of self.ohlcv_dfs are stacked lazily by ._stack_dfs() in their own dtypes and memoized.
+        The memo is discarded when self.ohlcv_dfs is reassigned or its elements are replaced,
+        which is detected by identities of dataframes, or when .preprocess_ohlcv_df() is called.
+        Dataframes must not be modified in place otherwise.
+        """
+        if len(self._stacked_dfs) != len(self.ohlcv_dfs) or any(
+            stacked_df is not df for stacked_df, df in zip(self._stacked_dfs, self.ohlcv_dfs)
+        ):
+            self._stacked_arr_cache.clear()
+            self._stacked_dfs = tuple(self.ohlcv_dfs)
+        return self._stacked_arr_cache.get(colname)
+
     def _stack_dfs(
         self,
         dfs: list[DataFrame],
@@ -427,10 +622,17 @@ class StylizedFactsChecker:
         Returns:
             stacked_arr (ndarray): array whose shape is (len(dfs), len(dfs[0]))
         """
+        if dfs is self.ohlcv_dfs:
+            stacked_arr: Optional[ndarray] = self._get_stacked_ohlcv_arr(colname)
+            if stacked_arr is not None:
+                return stacked_arr
         assert self._is_stacking_possible(dfs, colname)
-        col_arrs: list[ndarray] = [df[colname].dropna().values for df in dfs]
-        stacked_arr: ndarray = np.stack(col_arrs, axis=0)
-        assert stacked_arr.shape == (len(col_arrs), len(col_arrs[0]))
+        stacked_arr: ndarray = np.stack(
+            [df[colname].dropna().to_numpy() for df in dfs], axis=0
+        )
+        if dfs is self.ohlcv_dfs:
+            stacked_arr.setflags(write=False)
+            self._stacked_arr_cache[colname] = stacked_arr
         return stacked_arr
 
     def _calc_return_arr_from_df(
@@ -443,11 +645,11 @@ class StylizedFactsChecker:
 
         return_arr: (1, length of intraday time series)
         """
-        price_arr: ndarray = ohlcv_df[colname].dropna().values
+        price_arr: ndarray = ohlcv_df[colname].dropna().to_numpy()
         assert np.sum((price_arr <= 0)) == 0
-        return_arr: ndarray = np.log(
-            price_arr[1:] / price_arr[:-1] + 1e-10
-        )[np.newaxis,:]
+        return_arr: ndarray = np.diff(np.log(price_arr))[np.newaxis,:].astype(
+            self.return_dtype, copy=False
+        )
         if norm:
             return_arr: ndarray = (
                 return_arr - np.mean(return_arr, axis=1, keepdims=True)
@@ -467,8 +669,9 @@ class StylizedFactsChecker:
         """
         price_arr: ndarray = self._stack_dfs(ohlcv_dfs, colname)
         assert np.sum((price_arr <= 0)) == 0
-        return_arr: ndarray = np.log(
-            price_arr[:,1:] / price_arr[:,:-1] + 1e-10
+        log_price_arr: ndarray = np.log(price_arr)
+        return_arr: ndarray = (log_price_arr[:,1:] - log_price_arr[:,:-1]).astype(
+            self.return_dtype, copy=False
         )
         if norm:
             return_arr: ndarray = (
@@ -486,7 +689,7 @@ class StylizedFactsChecker:
         """convert scaled number of transactions time series to
         cumulative scaled number of transactions time series from 1 dataframe.
         """
-        scaled_transactions: ndarray = ohlcv_df[colname].dropna().values
+        scaled_transactions: ndarray = ohlcv_df[colname].dropna().to_numpy()
         cumsum_scaled_transactions = np.cumsum(scaled_transactions)[np.newaxis,:]
         return cumsum_scaled_transactions
 
@@ -502,6 +705,53 @@ class StylizedFactsChecker:
         cumsum_scaled_transactions = np.cumsum(scaled_transactions, axis=1)
         return cumsum_scaled_transactions
 
+    def _get_session_slice(
+        self,
+        session_name: str
+    ) -> slice | ndarray:
+        """get indexer of given session along the time axis of self.ohlcv_dfs.
+
+        The indexer is a slice found by binary search if the index is sorted, and a boolean mask
+        otherwise. It is memoized until self.ohlcv_dfs[0].index is replaced.
+
+        Args:
+            session_name (str): "session1" or "session2".
+        """
+        index: pd.Index = self.ohlcv_dfs[0].index
+        if session_name in self._session_slice_cache:
+            cached_index, session_slice = self._session_slice_cache[session_name]
+            if cached_index is index:
+                return session_slice
+        if session_name == "session1":
+            if index.is_monotonic_increasing:
+                session_slice = slice(
+                    0, index.searchsorted(self.session1_end_time, side="right")
+                )
+            else:
+                session_slice = np.asarray(index <= self.session1_end_time)
+        elif session_name == "session2":
+            if index.is_monotonic_increasing:
+                session_slice = slice(
+                    index.searchsorted(self.session2_start_time, side="left"), None
+                )
+            else:
+                session_slice = np.asarray(self.session2_start_time <= index)
+        else:
+            raise ValueError(
+                f"unknown session_name: {session_name}"
+            )
+        self._session_slice_cache[session_name] = (index, session_slice)
+        return session_slice
+
+    def _time_index_to_datetimes(
+        self,
+        index: pd.Index
+    ) -> list[datetime.datetime]:
+        """convert time index to datetimes on a dummy date to plot with matplotlib.
+        """
+        dummy_date = datetime.date(1990, 1, 1)
+        return [datetime.datetime.combine(dummy_date, t) for t in index]
+
     def check_kurtosis(self) -> tuple[ndarray, ndarray]:
         """check the kurtosis of given price time series.
 
@@ -565,12 +815,38 @@ class StylizedFactsChecker:
             raise ValueError(
                 "The shape of return_arr must be (number of data, length of time series)."
             )
-        kurtosis_arr: ndarray = kurtosis(
-            return_arr, axis=1, fisher=is_fisher, keepdims=True
+        # central moments are computed once and shared by kurtosis and kurtosis test.
+        n: int = return_arr.shape[1]
+        if n < 5:
+            raise ValueError(
+                f"kurtosis test requires at least 5 observations. n = {n}"
+            )
+        centered_arr: ndarray = return_arr - np.mean(return_arr, axis=1, keepdims=True)
+        squared_arr: ndarray = centered_arr * centered_arr
+        m2_arr: ndarray = np.mean(squared_arr, axis=1, keepdims=True)
+        m4_arr: ndarray = np.mean(squared_arr * squared_arr, axis=1, keepdims=True)
+        b2_arr: ndarray = m4_arr / (m2_arr * m2_arr)
+        kurtosis_arr: ndarray = b2_arr - 3.0 if is_fisher else b2_arr
+        # Anscombe-Glynn test as scipy.stats.kurtosistest(alternative="greater").
+        if n < 20:
+            warnings.warn(
+                f"kurtosis test is only valid for n >= 20. n = {n}"
+            )
+        expected_b2: float = 3.0 * (n-1) / (n+1)
+        var_b2: float = 24.0 * n * (n-2) * (n-3) / ((n+1) * (n+1.) * (n+3) * (n+5))
+        x_arr: ndarray = (b2_arr - expected_b2) / np.sqrt(var_b2)
+        sqrt_beta1: float = 6.0 * (n*n - 5*n + 2) / ((n+7) * (n+9)) * np.sqrt(
+            (6.0 * (n+3) * (n+5)) / (n * (n-2) * (n-3))
         )
-        pvalue_arr: ndarray = kurtosistest(
-            return_arr, axis=1, alternative="greater"
-        )[1][:,np.newaxis]
+        a: float = 6.0 + 8.0 / sqrt_beta1 * (2.0 / sqrt_beta1 + np.sqrt(1 + 4.0 / (sqrt_beta1**2)))
+        term1: float = 1 - 2 / (9.0 * a)
+        denom_arr: ndarray = 1 + x_arr * np.sqrt(2 / (a - 4.0))
+        with np.errstate(divide="ignore"):
+            term2_arr: ndarray = np.sign(denom_arr) * np.where(
+                denom_arr == 0.0, np.nan, np.power((1 - 2.0 / a) / np.abs(denom_arr), 1 / 3.0)
+            )
+        z_arr: ndarray = (term1 - term2_arr) / np.sqrt(2 / (9.0 * a))
+        pvalue_arr: ndarray = norm.sf(z_arr)
         return kurtosis_arr, pvalue_arr
 
     def check_hill_index(
@@ -613,7 +889,7 @@ class StylizedFactsChecker:
                 self.return_arr: ndarray = self._calc_return_arr_from_dfs(
                     self.ohlcv_dfs, "close", norm=True
                 )
-            return_arr_flatten: ndarray = self.return_arr.flatten()[np.newaxis,:]
+            return_arr_flatten: ndarray = self.return_arr.ravel()[np.newaxis,:]
             left_tail_arr, right_tail_arr, abs_tail_arr = self._calc_both_sides_hill_indices(
                 return_arr_flatten, cut_off_th
             )
@@ -621,17 +897,13 @@ class StylizedFactsChecker:
             warnings.warn(
                 "Could not stack dataframe. Maybe the lengths of dataframes differ. Following procedure may takes time..."
             )
-            return_arr_flatten: ndarray = np.array([], dtype=np.float32)
-            for ohlcv_df in self.ohlcv_dfs:
-                return_arr_flatten: ndarray = np.concatenate(
-                    [
-                        return_arr_flatten,
-                        self._calc_return_arr_from_df(
-                            ohlcv_df, "close", norm=True
-                        ).flatten()
-                    ]
-                )
-            return_arr_flatten = return_arr_flatten[np.newaxis,:]
+            return_arr_flatten: ndarray = np.concatenate(
+                [
+                    self._calc_return_arr_from_df(
+                        ohlcv_df, "close", norm=True
+                    ).ravel() for ohlcv_df in self.ohlcv_dfs
+                ]
+            )[np.newaxis,:]
             left_tail_arr, right_tail_arr, abs_tail_arr = self._calc_both_sides_hill_indices(
                 return_arr_flatten, cut_off_th
             )
@@ -645,8 +917,8 @@ class StylizedFactsChecker:
         if self._is_stacking_possible(self.ohlcv_dfs, "volume"):
             if self.volume_arr is None:
                 self.volume_arr: ndarray = self._stack_dfs(self.ohlcv_dfs, "volume")
-            volume_arr_flatten: ndarray = self.volume_arr.flatten()[np.newaxis,:]
-            sorted_volume_arr_flatten: ndarray = np.sort(volume_arr_flatten, axis=1)
+            volume_arr_flatten: ndarray = self.volume_arr.ravel()[np.newaxis,:]
+            sorted_volume_arr_flatten: ndarray = self._partition_tail(volume_arr_flatten, cut_off_th)
             volume_tail_arr: ndarray = self._calc_hill_indices(
                 sorted_volume_arr_flatten, cut_off_th
             )
@@ -654,16 +926,11 @@ class StylizedFactsChecker:
             warnings.warn(
                 "Could not stack dataframe. Maybe the lengths of dataframes differ. Following procedure may takes time..."
             )
-            volume_arr_flatten: ndarray = np.array([], dtype=np.float32)
-            for ohlcv_df in self.ohlcv_dfs:
-                volume_arr_flatten: ndarray = np.concatenate(
-                    [
-                        volume_arr_flatten,
-                        ohlcv_df["volume"].dropna().values
-                    ]
-                )
-            volume_arr_flatten = volume_arr_flatten[np.newaxis,:]
-            sorted_volume_arr_flatten: ndarray = np.sort(volume_arr_flatten, axis=1)
+            volume_arr_flatten: ndarray = np.concatenate(
+                [ohlcv_df["volume"].dropna().values for ohlcv_df in self.ohlcv_dfs],
+                dtype=np.float64
+            )[np.newaxis,:]
+            sorted_volume_arr_flatten: ndarray = self._partition_tail(volume_arr_flatten, cut_off_th)
             volume_tail_arr: ndarray = self._calc_hill_indices(
                 sorted_volume_arr_flatten, cut_off_th
             )
@@ -676,10 +943,14 @@ class StylizedFactsChecker:
     ) -> ndarray:
         """calculate right side Hill tail indices of ascendinglly sorted return array.
 
+        Hill index only needs the samples inside tail and the smallest of them.
+        Therefore, the array partitioned at the cut-off index by ._partition_tail() can be
+        used instead of the sorted array.
+
         Args:
             sorted_return_arr (ndarray): return array whose shape is
                 (number of data, length of time series).
-                This array must be ascendinglly sorted.
+                This array must be ascendinglly sorted or partitioned at the cut-off index.
             cut_off_th (float): threshold to cut-off samples inside tail of the distributions.
                 Default to 0.05.
 
@@ -687,13 +958,16 @@ class StylizedFactsChecker:
             tail_arr (ndarray): tail indices. (number of data, 1)
         """
         assert len(sorted_return_arr.shape) == 2
-        if np.sum(sorted_return_arr != np.sort(sorted_return_arr, axis=1)) != 0:
+        cut_idx: int = int(np.floor(sorted_return_arr.shape[1] * (1-cut_off_th)))
+        threshold_arr: ndarray = sorted_return_arr[:,cut_idx:cut_idx+1]
+        if (
+            np.any(threshold_arr < sorted_return_arr[:,:cut_idx]) or
+            np.any(sorted_return_arr[:,cut_idx:] < threshold_arr)
+        ):
             raise ValueError(
-                "sorted_return_arr must be ascendinglly sorted"
+                "sorted_return_arr must be ascendinglly sorted or partitioned at the cut-off index"
             )
-        cut_sorted_return_arr: ndarray = sorted_return_arr[
-            :,int(np.floor(sorted_return_arr.shape[1] * (1-cut_off_th))):
-        ]
+        cut_sorted_return_arr: ndarray = sorted_return_arr[:,cut_idx:]
         if np.sum(cut_sorted_return_arr <= 0) != 0:
             raise ValueError(
                 "Non positive elements found in tail area of sorted_return_arr. Maybe you should reduce cut_off_th."
@@ -707,6 +981,47 @@ class StylizedFactsChecker:
         print(f"number of sub-samples: {k} asymptotic standard deviation: {float(tail_arr) ** 2 / np.sqrt(k)}")
         return tail_arr
 
+    def _partition_tail(
+        self,
+        return_arr: ndarray,
+        cut_off_th: float = 0.05
+    ) -> ndarray:
+        """partition return array at the cut-off index of tail.
+
+        After partitioning, the elements after the cut-off index are the largest ones and
+        the element at the cut-off index is the smallest of them. This costs O(N) while sorting costs O(N log N).
+
+        Args:
+            return_arr (ndarray): return array whose shape is (number of data, length of time series).
+            cut_off_th (float): threshold to cut-off samples inside tail of the distributions.
+                Default to 0.05.
+
+        Returns:
+            partitioned_return_arr (ndarray): partitioned return array.
+        """
+        cut_idx: int = int(np.floor(return_arr.shape[1] * (1-cut_off_th)))
+        return np.partition(return_arr, cut_idx, axis=1)
+
+    def _sort_tail(
+        self,
+        return_arr: ndarray,
+        cut_off_th: float = 0.05
+    ) -> ndarray:
+        """partition return array at the cut-off index of tail and sort only the tail.
+
+        Args:
+            return_arr (ndarray): return array whose shape is (number of data, length of time series).
+            cut_off_th (float): threshold to cut-off samples inside tail of the distributions.
+                Default to 0.05.
+
+        Returns:
+            tail_sorted_return_arr (ndarray): partitioned return array whose tail is ascendinglly sorted.
+        """
+        cut_idx: int = int(np.floor(return_arr.shape[1] * (1-cut_off_th)))
+        tail_sorted_return_arr: ndarray = self._partition_tail(return_arr, cut_off_th)
+        tail_sorted_return_arr[:,cut_idx:].sort(axis=1)
+        return tail_sorted_return_arr
+
     def _calc_both_sides_hill_indices(
         self,
         return_arr: ndarray,
@@ -724,18 +1039,18 @@ class StylizedFactsChecker:
         """
         print("calculate left Hill tail index. summary: ")
         minus_return_arr: ndarray = - 1 * return_arr
-        sorted_minus_return_arr: ndarray = np.sort(minus_return_arr, axis=1)
+        sorted_minus_return_arr: ndarray = self._partition_tail(minus_return_arr, cut_off_th)
         left_tail_arr: ndarray = self._calc_hill_indices(
             sorted_minus_return_arr, cut_off_th
         )
         print("calculate right Hill tail index. summary: ")
-        sorted_return_arr: ndarray = np.sort(return_arr, axis=1)
+        sorted_return_arr: ndarray = self._partition_tail(return_arr, cut_off_th)
         right_tail_arr: ndarray = self._calc_hill_indices(
             sorted_return_arr, cut_off_th
         )
         print("calculate abs Hill tail index. summary: ")
-        sorted_abs_return_arr: ndarray = np.sort(
-            np.abs(return_arr), axis=1
+        sorted_abs_return_arr: ndarray = self._partition_tail(
+            np.abs(return_arr), cut_off_th
         )
         abs_tail_arr: ndarray = self._calc_hill_indices(
             sorted_abs_return_arr, cut_off_th
@@ -774,7 +1089,7 @@ class StylizedFactsChecker:
                 self.return_arr: ndarray = self._calc_return_arr_from_dfs(
                     self.ohlcv_dfs, "close", norm=True
                 )
-            return_arr_flatten: ndarray = self.return_arr.flatten()[np.newaxis,:]
+            return_arr_flatten: ndarray = self.return_arr.ravel()[np.newaxis,:]
             left_tail_arr, right_tail_arr, abs_tail_arr = self._calc_both_sides_lrls_coefficient(
                 return_arr_flatten, cut_off_th
             )
@@ -782,17 +1097,13 @@ class StylizedFactsChecker:
             warnings.warn(
                 "Could not stack dataframe. Maybe the lengths of dataframes differ. Following procedure may takes time..."
             )
-            return_arr_flatten: ndarray = np.array([], dtype=np.float32)
-            for ohlcv_df in self.ohlcv_dfs:
-                return_arr_flatten: ndarray = np.concatenate(
-                    [
-                        return_arr_flatten,
-                        self._calc_return_arr_from_df(
-                            ohlcv_df, "close", norm=True
-                        ).flatten()
-                    ]
-                )
-            return_arr_flatten = return_arr_flatten[np.newaxis,:]
+            return_arr_flatten: ndarray = np.concatenate(
+                [
+                    self._calc_return_arr_from_df(
+                        ohlcv_df, "close", norm=True
+                    ).ravel() for ohlcv_df in self.ohlcv_dfs
+                ]
+            )[np.newaxis,:]
             left_tail_arr, right_tail_arr, abs_tail_arr = self._calc_both_sides_lrls_coefficient(
                 return_arr_flatten, cut_off_th
             )
@@ -805,10 +1116,13 @@ class StylizedFactsChecker:
     ) -> ndarray:
         """calculate OLS estimater of tail index of ascendinglly sorted return array.
 
+        Only the samples inside tail must be sorted. Therefore, the array whose tail is sorted
+        by ._sort_tail() can be used instead of the sorted array.
+
         Args:
             sorted_return_arr (ndarray): return array whose shape is
                 (number of data, length of time series).
-                This array must be ascendinglly sorted.
+                This array must be ascendinglly sorted or partitioned at the cut-off index with sorted tail.
             cut_off_th (float): threshold to cut-off samples inside tail of the distributions.
                 Default to 0.05.
 
@@ -816,13 +1130,15 @@ class StylizedFactsChecker:
             tail_arr (ndarray): tail indices. (number of data, 1)
         """
         assert len(sorted_return_arr.shape) == 2
-        if np.sum(sorted_return_arr != np.sort(sorted_return_arr, axis=1)) != 0:
+        cut_idx: int = int(np.floor(sorted_return_arr.shape[1] * (1-cut_off_th)))
+        cut_sorted_return_arr: ndarray = sorted_return_arr[:,cut_idx:]
+        if (
+            np.any(cut_sorted_return_arr[:,:1] < sorted_return_arr[:,:cut_idx]) or
+            not np.all(np.diff(cut_sorted_return_arr, axis=1) >= 0)
+        ):
             raise ValueError(
-                "sorted_return_arr must be ascendinglly sorted"
+                "sorted_return_arr must be ascendinglly sorted or partitioned at the cut-off index with sorted tail"
             )
-        cut_sorted_return_arr: ndarray = sorted_return_arr[
-            :,int(np.floor(sorted_return_arr.shape[1] * (1-cut_off_th))):
-        ]
         if np.sum(cut_sorted_return_arr <= 0) != 0:
             raise ValueError(
                 "Non positive elements found in tail area of sorted_return_arr. Maybe you should reduce cut_off_th."
@@ -831,8 +1147,8 @@ class StylizedFactsChecker:
         ob_variables: ndarray = np.log(np.arange(1,k+1)[::-1])
         tails: list[float] = []
         for cut_sorted_return_arr_flatten in cut_sorted_return_arr:
-            ex_variables: ndarray = np.log(cut_sorted_return_arr_flatten.flatten())
-            if np.sum(ex_variables != np.sort(ex_variables)) != 0:
+            ex_variables: ndarray = np.log(cut_sorted_return_arr_flatten.ravel())
+            if not np.all(np.diff(ex_variables) >= 0):
                 raise ValueError(
                     "ex_variables must be ascendinglly sorted"
                 )
@@ -849,19 +1165,19 @@ class StylizedFactsChecker:
         return_arr: ndarray,
         cut_off_th: float = 0.05
     ) -> tuple[ndarray, ndarray]:
-        sorted_return_arr: ndarray = np.sort(return_arr, axis=1)
+        sorted_return_arr: ndarray = self._sort_tail(return_arr, cut_off_th)
         print("calculate right OLS tail index. summarization: ")
         right_tail_arr: ndarray = self._calc_lrls_coefficient(
             sorted_return_arr, cut_off_th
         )
         minus_return_arr: ndarray = - 1 * return_arr
-        sorted_minus_return_arr: ndarray = np.sort(minus_return_arr, axis=1)
+        sorted_minus_return_arr: ndarray = self._sort_tail(minus_return_arr, cut_off_th)
         print("calculate left OLS tail index. summarization: ")
         left_tail_arr: ndarray = self._calc_lrls_coefficient(
             sorted_minus_return_arr, cut_off_th
         )
-        sorted_abs_return_arr: ndarray = np.sort(
-            np.abs(return_arr), axis=1
+        sorted_abs_return_arr: ndarray = self._sort_tail(
+            np.abs(return_arr), cut_off_th
         )
         print("calculate abs OLS tail index. summarization: ")
         abs_tail_arr: ndarray = self._calc_lrls_coefficient(
@@ -873,8 +1189,9 @@ class StylizedFactsChecker:
     def check_autocorrelation(
         self,
         lags: list[int],
-        return_tail: bool = False
-    ) -> dict[int, ndarray] | list[ndarray]:
+        return_tail: bool = False,
+        as_array: bool = False
+    ) -> dict[int, ndarray] | ndarray | list[ndarray]:
         """check the dynamics of the autocorrelation of given price time series.
 
         Absolute returns are said to have long memory property. That is,
@@ -883,39 +1200,66 @@ class StylizedFactsChecker:
 
         This method estimates zeta through the following OLS model:
             log(Corr(|r_t|, |r_{t+lag}|)) = log(lag) * zeta + noise
+
+        Args:
+            lags (list[int]): lags in ascending order.
+            return_tail (bool): whether to return zeta and the first negative lag. Default to False.
+            as_array (bool): whether to return autocorrelations as one array whose column j
+                corresponds to lags[j] instead of dict. (1, number of lags) if dataframes can be stacked,
+                (number of data, number of lags) otherwise. Default to False.
         """
-        if self._is_stacking_possible(self.ohlcv_dfs, "close"):
+        is_stacking_possible: bool = self._is_stacking_possible(self.ohlcv_dfs, "close")
+        if is_stacking_possible:
             if self.return_arr is None:
                 self.return_arr: ndarray = self._calc_return_arr_from_dfs(
                     self.ohlcv_dfs, "close", norm=True
                 )
-            acorr_dic: dict[int, ndarray] = self._calc_autocorrelation(
-                np.abs(self.return_arr), lags, keepdim=False
+            if self.abs_return_arr is None:
+                self.abs_return_arr: ndarray = np.abs(self.return_arr)
+            acorr_arr: ndarray = self._calc_autocorrelation(
+                self.abs_return_arr, lags, keepdim=False
             )
         else:
             warnings.warn(
                 "Could not stack dataframe. Maybe the lengths of dataframes differ. Following procedure may takes time..."
             )
-            acorr_l_dic: dict[int, list[float]] = {lag: [] for lag in lags}
+            acorr_arrs: list[ndarray] = []
             for ohlcv_df in self.ohlcv_dfs:
                 return_arr: ndarray = self._calc_return_arr_from_df(
                     ohlcv_df, "close", norm=True
                 )
-                acorr_dic_: dict[int, float] = self._calc_autocorrelation(
-                    np.abs(return_arr), lags, keepdim=False
+                acorr_arrs.append(
+                    self._calc_autocorrelation(np.abs(return_arr), lags, keepdim=False)
                 )
-                for lag in lags:
-                    acorr_l_dic[lag].append(acorr_dic_[lag].item())
-            acorr_dic: dict[int, ndarray] = {}
-            for lag, acorrs in acorr_l_dic.items():
-                acorr_dic[lag] = np.array(acorrs)[:,np.newaxis]
+            acorr_arr: ndarray = np.concatenate(acorr_arrs, axis=0)
         if not return_tail:
-            return acorr_dic
+            if as_array:
+                return acorr_arr
+            if is_stacking_possible:
+                return {lag: acorr_arr[0,i] for i, lag in enumerate(lags)}
+            return {lag: acorr_arr[:,i:i+1] for i, lag in enumerate(lags)}
+        return self._calc_autocorrelation_tail(acorr_arr, lags)
+
+    def _calc_autocorrelation_tail(
+        self,
+        acorr_arr: ndarray,
+        lags: list[int]
+    ) -> list[ndarray]:
+        """estimate the power-law decay of autocorrelations and the first negative lag.
+
+        Args:
+            acorr_arr (ndarray): autocorrelations whose column j corresponds to lags[j].
+            lags (list[int]): lags to use in ascending order.
+
+        Returns:
+            tail_arr (ndarray): estimated zeta. (1,1)
+            first_negative_lag_arr (ndarray): first lag whose mean autocorrelation is negative. (1,1)
+        """
         first_negative_lag: int = -1
         log_lags: list[float] = []
         log_acorrs: list[float] = []
         for i, lag in enumerate(lags):
-            acorr_mean: float = np.mean(acorr_dic[lag])
+            acorr_mean: float = np.mean(acorr_arr[:,i])
             if acorr_mean < 0:
                 first_negative_lag = lag
                 break
@@ -941,45 +1285,52 @@ class StylizedFactsChecker:
         abs_return_arr: ndarray,
         lags: list[int],
         keepdim: bool = True,
-    ) -> dict[int, ndarray | float]:
-        """_summary_
+    ) -> ndarray:
+        """calculate autocorrelations of all lags at once.
 
         Args:
-            return_arr (ndarray): _description_
-            lags (list[int]): _description_
+            abs_return_arr (ndarray): absolute returns. (number of data, length of time series)
+            lags (list[int]): lags.
+            keepdim (bool): whether to calculate autocorrelations of each time series.
+                If False, autocorrelations are calculated over all time series. Default to True.
 
         Returns:
-            dict[int, ndarray]: _description_
+            acorr_arr (ndarray): autocorrelations whose column j corresponds to lags[j].
+                (number of data, number of lags) if keepdim else (1, number of lags).
         """
-        acorr_dic: list[int, ndarray] = {}
-        for lag in lags:
-            abs_mean: float | ndarray = np.mean(
-                abs_return_arr, axis=1, keepdims=True
-            ) if keepdim else np.mean(abs_return_arr)
-            acov: ndarray | float = np.mean(
-                (abs_return_arr[:,lag:]-abs_mean)*(abs_return_arr[:,:-lag]-abs_mean),
-                axis=1, keepdims=True
-            ) if keepdim else np.mean(
-                (abs_return_arr[:,lag:]-abs_mean)*(abs_return_arr[:,:-lag]-abs_mean)
-            )
-            var: ndarray | float = np.var(
-                abs_return_arr, axis=1, keepdims=True
-            )  if keepdim else np.var(abs_return_arr)
-            acorr_dic[lag] = acov / (var + 1e-10)
-        return acorr_dic
+        # mean and variance do not depend on lag.
+        abs_mean: float | ndarray = np.mean(
+            abs_return_arr, axis=1, keepdims=True
+        ) if keepdim else np.mean(abs_return_arr)
+        var: ndarray | float = np.var(
+            abs_return_arr, axis=1, keepdims=True
+        )  if keepdim else np.var(abs_return_arr)
+        centered_arr: ndarray = abs_return_arr - abs_mean
+        # lagged products of all lags are summed at once by FFT. zero padding to twice the length
+        # prevents circular wrap-around.
+        length: int = centered_arr.shape[1]
+        spectrum_arr: ndarray = np.fft.rfft(centered_arr, n=2*length, axis=1)
+        lagged_sum_arr: ndarray = np.fft.irfft(
+            spectrum_arr * np.conj(spectrum_arr), n=2*length, axis=1
+        )[:,lags]
+        num_products_arr: ndarray = length - np.array(lags)
+        acov_arr: ndarray = lagged_sum_arr / num_products_arr if keepdim else \
+            np.sum(lagged_sum_arr, axis=0, keepdims=True) / (len(centered_arr) * num_products_arr)
+        return acov_arr / (var + 1e-10)
 
     def check_volume_volatility_correlation(self) -> ndarray:
         if self._is_stacking_possible(self.ohlcv_dfs, "close"):
-            volume_arr: ndarray = self._stack_dfs(
-                self.ohlcv_dfs, "volume"
-            )
-            volume_arr = volume_arr[:,1:]
+            if self.volume_arr is None:
+                self.volume_arr: ndarray = self._stack_dfs(self.ohlcv_dfs, "volume")
+            volume_arr: ndarray = self.volume_arr[:,1:]
             if self.return_arr is None:
                 self.return_arr: ndarray = self._calc_return_arr_from_dfs(
                     self.ohlcv_dfs, "close", norm=True
                 )
+            if self.abs_return_arr is None:
+                self.abs_return_arr: ndarray = np.abs(self.return_arr)
             corr_arr: ndarray = self._calc_volume_volatility_correlation(
-                np.abs(self.return_arr), volume_arr
+                self.abs_return_arr, volume_arr
             )
         else:
             warnings.warn(
@@ -1013,26 +1364,54 @@ class StylizedFactsChecker:
         Returns:
             ndarray: _description_ (number of data, 1).
         """
-        abs_return_mean: ndarray = np.mean(
-            abs_return_arr, axis=1, keepdims=True
-        )
-        volume_mean: ndarray = np.mean(
-            volume_arr, axis=1, keepdims=True
+        length: int = abs_return_arr.shape[1]
+        # covariance and variances are contracted by einsum without materializing products.
+        # centered arrays are written into scratch buffers reused across calls.
+        abs_return_mean_arr: ndarray = np.mean(abs_return_arr, axis=1, keepdims=True)
+        centered_abs_return_arr: ndarray = np.subtract(
+            abs_return_arr, abs_return_mean_arr,
+            out=self._get_scratch_arr(
+                "centered_abs_return",
+                abs_return_arr.shape,
+                np.result_type(abs_return_arr, abs_return_mean_arr)
+            )
         )
-        abs_retrurn_std: ndarray = np.std(
-            abs_return_arr, axis=1, keepdims=True
+        volume_mean_arr: ndarray = np.mean(volume_arr, axis=1, keepdims=True)
+        centered_volume_arr: ndarray = np.subtract(
+            volume_arr, volume_mean_arr,
+            out=self._get_scratch_arr(
+                "centered_volume",
+                volume_arr.shape,
+                np.result_type(volume_arr, volume_mean_arr)
+            )
         )
-        volume_std: ndarray = np.std(
-            volume_arr, axis=1, keepdims=True
+        abs_retrurn_std: ndarray = np.sqrt(
+            np.einsum("ij,ij->i", centered_abs_return_arr, centered_abs_return_arr) / length
         )
-        volume_volatility_correlation: ndarray = np.mean(
-            (abs_return_arr - abs_return_mean) * (volume_arr - volume_mean),
-            axis=1, keepdims=True
-        ) / (
-            abs_retrurn_std * volume_std + 1e-10
+        volume_std: ndarray = np.sqrt(
+            np.einsum("ij,ij->i", centered_volume_arr, centered_volume_arr) / length
         )
-        return volume_volatility_correlation
+        # the denominator is floored in place instead of biased by adding epsilon.
+        denominator_arr: ndarray = abs_retrurn_std * volume_std
+        np.maximum(denominator_arr, 1e-10, out=denominator_arr)
+        volume_volatility_correlation: ndarray = (
+            np.einsum("ij,ij->i", centered_abs_return_arr, centered_volume_arr) / length
+        ) / denominator_arr
+        return volume_volatility_correlation[:,np.newaxis]
     
+    def _get_scratch_arr(
+        self,
+        name: str,
+        shape: tuple[int, ...],
+        dtype: np.dtype
+    ) -> ndarray:
+        """get scratch buffer named name. It is reallocated only if shape or dtype changes."""
+        scratch_arr: Optional[ndarray] = self._scratch_arr_dic.get(name)
+        if scratch_arr is None or scratch_arr.shape != shape or scratch_arr.dtype != dtype:
+            scratch_arr = np.empty(shape, dtype=dtype)
+            self._scratch_arr_dic[name] = scratch_arr
+        return scratch_arr
+
     def check_dtw(self) -> ndarray:
         if self._is_stacking_possible(self.ohlcv_dfs, "close"):
             if self.return_arr is not None:
@@ -1074,51 +1453,55 @@ class StylizedFactsChecker:
             kurtosis_arr, p_values = self.check_kurtosis()
             left_hill_tail_arr, right_hill_tail_arr, abs_hill_tail_arr = self.check_hill_index()
             left_lrls_tail_arr, right_lrls_tail_arr, abs_lrls_tail_arr = self.check_lrls_coefficient()
-            left_hill_tail_arr = np.repeat(left_hill_tail_arr, repeats=kurtosis_arr.shape[0])
-            right_hill_tail_arr = np.repeat(right_hill_tail_arr, repeats=kurtosis_arr.shape[0])
-            abs_hill_tail_arr = np.repeat(abs_hill_tail_arr, repeats=kurtosis_arr.shape[0])
-            left_lrls_tail_arr = np.repeat(left_lrls_tail_arr, repeats=kurtosis_arr.shape[0])
-            right_lrls_tail_arr = np.repeat(right_lrls_tail_arr, repeats=kurtosis_arr.shape[0])
-            abs_lrls_tail_arr = np.repeat(abs_lrls_tail_arr, repeats=kurtosis_arr.shape[0])
+            # indices shared by all data are broadcast as zero-copy views.
+            data_shape: tuple[int] = (kurtosis_arr.shape[0],)
+            left_hill_tail_arr = np.broadcast_to(left_hill_tail_arr.ravel(), data_shape)
+            right_hill_tail_arr = np.broadcast_to(right_hill_tail_arr.ravel(), data_shape)
+            abs_hill_tail_arr = np.broadcast_to(abs_hill_tail_arr.ravel(), data_shape)
+            left_lrls_tail_arr = np.broadcast_to(left_lrls_tail_arr.ravel(), data_shape)
+            right_lrls_tail_arr = np.broadcast_to(right_lrls_tail_arr.ravel(), data_shape)
+            abs_lrls_tail_arr = np.broadcast_to(abs_lrls_tail_arr.ravel(), data_shape)
             volume_tail_arr = self.check_hill_index_volume()
-            volume_tail_arr = np.repeat(volume_tail_arr, repeats=kurtosis_arr.shape[0])
+            volume_tail_arr = np.broadcast_to(volume_tail_arr.ravel(), data_shape)
             volume_volatility_correlation = self.check_volume_volatility_correlation()
-            acorr_dic: dict[int, ndarray] = self.check_autocorrelation(
-                [lag for lag in range(1,30)], return_tail=False
+            # autocorrelations of all lags are calculated in one pass and shared by
+            # the autocorrelation columns and the tail estimation.
+            tail_lags: list[int] = [lag for lag in range(1,71)]
+            acorr_arr: ndarray = self.check_autocorrelation(
+                tail_lags, return_tail=False, as_array=True
             )
-            acorr_tail_arr, first_negative_lag_arr = self.check_autocorrelation(
-                [lag for lag in range(1,71)], return_tail=True
-            )
-            acorr_tail_arr = np.repeat(acorr_tail_arr, repeats=kurtosis_arr.shape[0])
-            first_negative_lag_arr = np.repeat(
-                first_negative_lag_arr, repeats=kurtosis_arr.shape[0]
+            acorr_tail_arr, first_negative_lag_arr = self._calc_autocorrelation_tail(
+                acorr_arr, tail_lags
             )
+            acorr_tail_arr = np.broadcast_to(acorr_tail_arr.ravel(), data_shape)
+            first_negative_lag_arr = np.broadcast_to(first_negative_lag_arr.ravel(), data_shape)
             dtw_arr: ndarray = self.check_dtw()
             data_dic: dict[str, ndarray]= {
-                "kurtosis": kurtosis_arr.flatten(),
-                "kurtosis_p": p_values.flatten(),
-                "hill tail (left)": left_hill_tail_arr.flatten(),
-                "hill tail (right)": right_hill_tail_arr.flatten(),
-                "hill tail (abs)": abs_hill_tail_arr.flatten(),
-                "lrls tail (left)": left_lrls_tail_arr.flatten(),
-                "lrls tail (right)": right_lrls_tail_arr.flatten(),
-                "lrls tail (abs)": abs_lrls_tail_arr.flatten(),
-                "hill tail (volume)": volume_tail_arr.flatten(),
-                "vv_corr": volume_volatility_correlation.flatten(),
-                "tail (acorr)": acorr_tail_arr.flatten(),
-                "first negative lag": first_negative_lag_arr.flatten(),
-                "dtw": dtw_arr.flatten()
+                "kurtosis": kurtosis_arr,
+                "kurtosis_p": p_values,
+                "hill tail (left)": left_hill_tail_arr,
+                "hill tail (right)": right_hill_tail_arr,
+                "hill tail (abs)": abs_hill_tail_arr,
+                "lrls tail (left)": left_lrls_tail_arr,
+                "lrls tail (right)": right_lrls_tail_arr,
+                "lrls tail (abs)": abs_lrls_tail_arr,
+                "hill tail (volume)": volume_tail_arr,
+                "vv_corr": volume_volatility_correlation,
+                "tail (acorr)": acorr_tail_arr,
+                "first negative lag": first_negative_lag_arr,
+                "dtw": dtw_arr
             }
-            for lag, acorr_arr in acorr_dic.items():
-                data_dic[f"acorr_{lag}"] = np.repeat(
-                    acorr_arr, repeats=kurtosis_arr.shape[0]
-                ).flatten()
-            stylized_facts_df: DataFrame = pd.DataFrame(data_dic)
+            for j, lag in enumerate(range(1,30)):
+                data_dic[f"acorr_{lag}"] = np.broadcast_to(acorr_arr[:,j], data_shape)
+            # the dataframe is built from typed columns at once so that each dtype is kept without casting.
+            stylized_facts_df: DataFrame = pd.DataFrame(
+                {colname: data_arr.reshape(-1) for colname, data_arr in data_dic.items()}
+            )
             if print_results:
                 self.print_results(stylized_facts_df)
             if not save_path.parent.exists():
                 save_path.parent.mkdir(parents=True)
-            stylized_facts_df.to_csv(str(save_path))
+            self._to_csv(stylized_facts_df, save_path)
 
     def print_results(
         self,
@@ -1129,12 +1512,10 @@ class StylizedFactsChecker:
         table.add_column("Mean", justify="left", style="magenta")
         table.add_column("Std", justify="left", style="green")
         described_df: DataFrame = stylized_facts_df.describe()
-        for column_name in stylized_facts_df.columns:
-            table.add_row(
-                column_name,
-                str(described_df.loc["mean"][column_name]),
-                str(described_df.loc["std"][column_name])
-            )
+        means: ndarray = described_df.loc["mean"].to_numpy()
+        stds: ndarray = described_df.loc["std"].to_numpy()
+        for column_name, mean, std in zip(described_df.columns, means, stds):
+            table.add_row(column_name, str(mean), str(std))
         console = Console()
         console.print(table)
 
@@ -1169,7 +1550,7 @@ class StylizedFactsChecker:
                     self.return_arr: ndarray = self._calc_return_arr_from_dfs(
                         self.ohlcv_dfs, "close", norm=True
                     )
-                return_arr: ndarray = self.return_arr.flatten()
+                return_arr: ndarray = self.return_arr.ravel()
             else:
                 warnings.warn(
                     "Could not stack dataframe. Maybe the lengths of dataframes differ." + \
@@ -1180,18 +1561,27 @@ class StylizedFactsChecker:
                     return_arrs.append(
                         self._calc_return_arr_from_df(
                             ohlcv_df, "close", norm=True
-                        ).flatten()
+                        ).ravel()
                     )
                 return_arr: ndarray = np.concatenate(return_arrs)
         else:
             return_arr: ndarray = self._calc_return_arr_from_df(
                 self.ohlcv_dfs[draw_idx], "close", norm=True
-            ).flatten()
+            ).ravel()
         assert len(return_arr.shape) == 1
-        sorted_abs_return_arr: ndarray = np.sort(np.abs(return_arr))
-        ccdf: ndarray = 1 - (
-            1 + np.arange(len(sorted_abs_return_arr))
-        ) / len(sorted_abs_return_arr)
+        xlim: list[float] = [1, 40]
+        # single precision is enough for the log-log plot and halves the memory traffic of sorting.
+        abs_return_arr: ndarray = np.abs(return_arr, dtype=np.float32)
+        # only samples inside xlim, and the largest one below it to draw the line from the edge,
+        # are sorted. CCDF is calculated from the ranks in the whole samples.
+        is_drawn: ndarray = xlim[0] <= abs_return_arr
+        below_abs_return_arr: ndarray = abs_return_arr[~is_drawn]
+        sorted_abs_return_arr: ndarray = np.sort(abs_return_arr[is_drawn])
+        if 0 < len(below_abs_return_arr):
+            sorted_abs_return_arr = np.concatenate(
+                [[np.max(below_abs_return_arr)], sorted_abs_return_arr]
+            )
+        ccdf: ndarray = np.arange(len(sorted_abs_return_arr)-1, -1, -1) / len(abs_return_arr)
         if ax is None:
             fig: Figure = plt.figure(figsize=(10,6))
             ax: Axes = fig.add_subplot(1,1,1)
@@ -1201,7 +1591,7 @@ class StylizedFactsChecker:
         ax.set_xlabel("abs return")
         ax.set_ylabel("CCDF")
         #ax.set_title("Complementary Cumulative Distribution Function (CCDF) of absolute price returns")
-        ax.set_xlim([1, 40])
+        ax.set_xlim(xlim)
         ax.set_ylim([1e-06, 1])
         if img_save_name is not None:
             if self.figs_save_path is None:
@@ -1215,49 +1605,95 @@ class StylizedFactsChecker:
         self,
         transactions_save_path: Optional[Path] = None,
         return_mean: bool = True,
-        session_name: Optional[int] = None
+        session_name: Optional[int] = None,
+        cumsum_scaled_transactions_arr: Optional[ndarray] = None
     ) -> Optional[ndarray]:
+        """calculate cumulative scaled number of transactions of all dataframes and their mean.
+
+        Args:
+            transactions_save_path (Optional[Path]): path to save cumulative transactions. Default to None.
+            return_mean (bool): whether to return the mean. Default to True.
+            session_name (Optional[int]): None, "session1" or "session2". Default to None.
+            cumsum_scaled_transactions_arr (Optional[ndarray]): precomputed cumulative transactions of
+                the column corresponding to session_name. (number of data, length of time series).
+                Computed from self.ohlcv_dfs if None. Default to None.
+        """
         assert self._is_stacking_possible(self.ohlcv_dfs, "scaled_num_events")
         if session_name is None:
-            cumsum_scaled_transactions_arr: ndarray = self._calc_cumsum_transactions_from_dfs(
-                self.ohlcv_dfs, colname="scaled_num_events"
-            )
+            if cumsum_scaled_transactions_arr is None:
+                cumsum_scaled_transactions_arr = self._calc_cumsum_transactions_from_dfs(
+                    self.ohlcv_dfs, colname="scaled_num_events"
+                )
             indexes = self.ohlcv_dfs[0].index
         elif session_name == "session1":
-            cumsum_scaled_transactions_arr: ndarray = self._calc_cumsum_transactions_from_dfs(
-                self.ohlcv_dfs, colname="session1_scaled_num_events"
-            )
-            cumsum_scaled_transactions_arr = cumsum_scaled_transactions_arr[
-                :, (self.ohlcv_dfs[0].index <= self.session1_end_time)
-            ]
-            indexes = self.ohlcv_dfs[0][self.ohlcv_dfs[0].index <= self.session1_end_time].index
+            if cumsum_scaled_transactions_arr is None:
+                cumsum_scaled_transactions_arr = self._calc_cumsum_transactions_from_dfs(
+                    self.ohlcv_dfs, colname="session1_scaled_num_events"
+                )
+            session_slice: slice | ndarray = self._get_session_slice(session_name)
+            cumsum_scaled_transactions_arr = cumsum_scaled_transactions_arr[:, session_slice]
+            indexes = self.ohlcv_dfs[0].index[session_slice]
         elif session_name == "session2":
-            cumsum_scaled_transactions_arr: ndarray = self._calc_cumsum_transactions_from_dfs(
-                self.ohlcv_dfs, colname="session2_scaled_num_events"
-            )
-            cumsum_scaled_transactions_arr = cumsum_scaled_transactions_arr[
-                :, (self.session2_start_time <= self.ohlcv_dfs[0].index)
-            ]
-            indexes = self.ohlcv_dfs[0][self.session2_start_time <= self.ohlcv_dfs[0].index].index
+            if cumsum_scaled_transactions_arr is None:
+                cumsum_scaled_transactions_arr = self._calc_cumsum_transactions_from_dfs(
+                    self.ohlcv_dfs, colname="session2_scaled_num_events"
+                )
+            session_slice: slice | ndarray = self._get_session_slice(session_name)
+            cumsum_scaled_transactions_arr = cumsum_scaled_transactions_arr[:, session_slice]
+            indexes = self.ohlcv_dfs[0].index[session_slice]
         else:
             raise ValueError(
                 f"unknown session_name: {session_name}"
             )
         cumsum_scaled_transactions_arr = cumsum_scaled_transactions_arr.T
-        cumsum_scaled_transactions_df: DataFrame = pd.DataFrame(
-            data=cumsum_scaled_transactions_arr, index=indexes
-        )
         mean_cumsum_scaled_transactions_arr: ndarray = np.mean(
             cumsum_scaled_transactions_arr, axis=1
         )
-        cumsum_scaled_transactions_df["mean"] = mean_cumsum_scaled_transactions_arr
         if transactions_save_path is not None:
-            cumsum_scaled_transactions_df.to_csv(str(transactions_save_path))
+            self._write_transactions_csv(
+                transactions_save_path, indexes,
+                cumsum_scaled_transactions_arr, mean_cumsum_scaled_transactions_arr
+            )
         if return_mean:
             return mean_cumsum_scaled_transactions_arr
         else:
             return None
 
+    def _write_transactions_csv(
+        self,
+        transactions_save_path: Path,
+        indexes: pd.Index,
+        cumsum_scaled_transactions_arr: ndarray,
+        mean_cumsum_scaled_transactions_arr: ndarray
+    ) -> None:
+        """write cumulative transactions and their mean as csv without building a dataframe.
+
+        The layout is the same as DataFrame.to_csv: index in the first column, one column per data
+        and "mean" in the last column.
+
+        Args:
+            transactions_save_path (Path): path to save csv.
+            indexes (pd.Index): time index. (length of time series,)
+            cumsum_scaled_transactions_arr (ndarray): (length of time series, number of data)
+            mean_cumsum_scaled_transactions_arr (ndarray): (length of time series,)
+        """
+        def to_cells(arr: ndarray) -> list:
+            if self.csv_float_format is not None and np.issubdtype(arr.dtype, np.floating):
+                return np.char.mod(self.csv_float_format, arr).tolist()
+            return arr.tolist()
+        header: list[str] = [
+            "" if indexes.name is None else indexes.name
+        ] + [str(i) for i in range(cumsum_scaled_transactions_arr.shape[1])] + ["mean"]
+        with open(transactions_save_path, "w", newline="") as f:
+            writer = csv.writer(f, lineterminator="\n")
+            writer.writerow(header)
+            writer.writerows(
+                [str(index)] + cells + [mean_cell] for index, cells, mean_cell in zip(
+                    indexes, to_cells(cumsum_scaled_transactions_arr),
+                    to_cells(mean_cumsum_scaled_transactions_arr)
+                )
+            )
+
     def calc_cumulative_transactions_per_session(
         self,
         transactions_save_folder_path: Path
@@ -1266,22 +1702,34 @@ class StylizedFactsChecker:
             self._is_stacking_possible(self.ohlcv_dfs, "scaled_num_events") and
             self._is_stacking_possible(self.ohlcv_dfs, "session1_scaled_num_events")
         ):
+            is_session2_saved: bool = (
+                self.session2_transactions_file_name is not None and
+                self._is_stacking_possible(self.ohlcv_dfs, "session2_scaled_num_events")
+            )
+            colnames: list[str] = ["scaled_num_events", "session1_scaled_num_events"]
+            if is_session2_saved:
+                colnames.append("session2_scaled_num_events")
+            # cumulative transactions of all columns are calculated at once.
+            cumsum_scaled_transactions_arrs: ndarray = np.cumsum(
+                np.stack([self._stack_dfs(self.ohlcv_dfs, colname) for colname in colnames]),
+                axis=2
+            )
             transactions_save_path: Path = transactions_save_folder_path / "cumsum_scaled_transactions.csv"
             self.calc_mean_cumulative_transactions(
-                transactions_save_path, return_mean=False
+                transactions_save_path, return_mean=False,
+                cumsum_scaled_transactions_arr=cumsum_scaled_transactions_arrs[0]
             )
             transactions_session1_save_path: Path = transactions_save_folder_path / self.session1_transactions_file_name
             self.calc_mean_cumulative_transactions(
-                transactions_session1_save_path, return_mean=False, session_name="session1"
+                transactions_session1_save_path, return_mean=False, session_name="session1",
+                cumsum_scaled_transactions_arr=cumsum_scaled_transactions_arrs[1]
             )
-            if (
-                self.session2_transactions_file_name is not None and
-                self._is_stacking_possible(self.ohlcv_dfs, "session2_scaled_num_events")
-            ):
+            if is_session2_saved:
                 transactions_session2_save_path: Path = transactions_save_folder_path / self.session2_transactions_file_name
                 self.calc_mean_cumulative_transactions(
                     transactions_session2_save_path, return_mean=False,
-                    session_name="session2"
+                    session_name="session2",
+                    cumsum_scaled_transactions_arr=cumsum_scaled_transactions_arrs[2]
                 )
         else:
             raise ValueError(
@@ -1296,30 +1744,40 @@ class StylizedFactsChecker:
     ) -> None:
         fig: Figure = plt.figure(figsize=(10,6))
         ax: Axes = fig.add_subplot(1,1,1)
-        dummy_date = datetime.date(1990, 1, 1)
-        current_plot_num: int = 0
-        for ohlcv_df in self.ohlcv_dfs:
-            datetimes = [
-                datetime.datetime.combine(dummy_date, t) for t in ohlcv_df.index
-            ]
-            cumsum_scaled_transactions_arr: ndarray = self._calc_cumsum_transactions_from_df(
-                ohlcv_df, colname="scaled_num_events"
+        if self._is_stacking_possible(self.ohlcv_dfs, "scaled_num_events"):
+            datetimes: list[datetime.datetime] = self._time_index_to_datetimes(self.ohlcv_dfs[0].index)
+            cumsum_scaled_transactions_arrs: ndarray = self._calc_cumsum_transactions_from_dfs(
+                self.ohlcv_dfs, colname="scaled_num_events"
             )
+            # all time series are drawn as one collection. datetimes are converted to matplotlib
+            # date numbers once and tiled, since the x axis is formatted by mdates below.
+            date_num_arr: ndarray = mdates.date2num(datetimes)
+            plotted_arrs: ndarray = cumsum_scaled_transactions_arrs[:max_plot_num]
             ax.scatter(
-                datetimes, cumsum_scaled_transactions_arr,
+                np.tile(date_num_arr, len(plotted_arrs)), plotted_arrs.ravel(),
                 color=color, s=1, rasterized=True
             )
-            current_plot_num += 1
-            if max_plot_num <= current_plot_num:
-                break
-        if self._is_stacking_possible(self.ohlcv_dfs, "scaled_num_events"):
             mean_cumsum_scaled_transactions_arr: ndarray = self.calc_mean_cumulative_transactions(
-                return_mean=True
+                return_mean=True,
+                cumsum_scaled_transactions_arr=cumsum_scaled_transactions_arrs
             )
             ax.plot(
-                datetimes, mean_cumsum_scaled_transactions_arr, color="red"
+                date_num_arr, mean_cumsum_scaled_transactions_arr, color="red"
             )
         else:
+            current_plot_num: int = 0
+            for ohlcv_df in self.ohlcv_dfs:
+                datetimes: list[datetime.datetime] = self._time_index_to_datetimes(ohlcv_df.index)
+                cumsum_scaled_transactions_arr: ndarray = self._calc_cumsum_transactions_from_df(
+                    ohlcv_df, colname="scaled_num_events"
+                )
+                ax.scatter(
+                    datetimes, cumsum_scaled_transactions_arr,
+                    color=color, s=1, rasterized=True
+                )
+                current_plot_num += 1
+                if max_plot_num <= current_plot_num:
+                    break
             warnings.warn(
                 "Could not plot mean cumulative transactions."
             )
@@ -1346,10 +1804,7 @@ class StylizedFactsChecker:
     ) -> None:
         print(f"plot prices of {self.ohlcv_csv_names[draw_idx]}")
         ohlcv_df: DataFrame = self.ohlcv_dfs[draw_idx]
-        dummy_date = datetime.date(1990, 1, 1)
-        datetimes = [
-                datetime.datetime.combine(dummy_date, t) for t in ohlcv_df.index
-        ]
+        datetimes: list[datetime.datetime] = self._time_index_to_datetimes(ohlcv_df.index)
         price_arr: ndarray = ohlcv_df["close"].values
         volume_arr: ndarray = ohlcv_df["volume"].values
         if "mood" in ohlcv_df.columns:
@@ -1403,7 +1858,7 @@ class StylizedFactsChecker:
         if self._is_stacking_possible(self.ohlcv_dfs, "close"):
             return_arr: ndarray = self._calc_return_arr_from_dfs(
                 self.ohlcv_dfs, "close", norm=False
-            ).flatten()
+            ).ravel()
         else:
             warnings.warn(
                 "Could not stack dataframe. Maybe the lengths of dataframes differ." + \
@@ -1414,14 +1869,14 @@ class StylizedFactsChecker:
                 return_arrs.append(
                     self._calc_return_arr_from_df(
                         ohlcv_df, "close", norm=False
-                    ).flatten()
+                    ).ravel()
                 )
             return_arr: ndarray = np.concatenate(return_arrs)
         if self._is_stacking_possible(self.ohlcv_dfs, "volume"):
             volume_arr: ndarray = self._stack_dfs(
                 self.ohlcv_dfs, "volume"
             )
-            volume_arr = (volume_arr / volume_arr.sum(axis=1)[:,np.newaxis]).flatten()
+            volume_arr = (volume_arr / volume_arr.sum(axis=1)[:,np.newaxis]).ravel()
         else:
             warnings.warn(
                 "Could not stack dataframe. Maybe the lengths of dataframes differ." + \
@@ -1431,7 +1886,7 @@ class StylizedFactsChecker:
             for ohlcv_df in self.ohlcv_dfs:
                 volume_arr = ohlcv_df["volume"].values
                 volume_arrs.append(
-                    (volume_arr / volume_arr.sum()).flatten()
+                    (volume_arr / volume_arr.sum()).ravel()
                 )
             volume_arr: ndarray = np.concatenate(volume_arrs)
         fig = plt.figure(figsize=(20,20), dpi=50, facecolor="w")
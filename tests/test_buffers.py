@@ -0,0 +1,153 @@
+import numpy as np
+from numpy import ndarray
+import pathlib
+from pathlib import Path
+curr_path: Path = pathlib.Path(__file__).resolve().parents[0]
+root_path: Path = curr_path.parents[0]
+import pytest
+import random
+import sys
+sys.path.append(str(root_path / "drl_algos"))
+from buffers import RolloutBuffer4IPPO
+import torch
+from torch import Tensor
+
+BUFFER_SIZE: int = 6
+NUM_AGENTS: int = 4
+OBS_SHAPE: tuple[int] = (3,)
+ACTION_SHAPE: tuple[int] = (2,)
+
+class NaiveRolloutBuffer:
+    """Reference rollout buffer storing experiences of each agent in python lists."""
+    def __init__(self, buffer_size: int, num_agents: int) -> None:
+        self.buffer_size: int = buffer_size
+        self.rows: list[dict[str, list]] = [self._empty_row() for _ in range(num_agents)]
+
+    def _empty_row(self) -> dict[str, list]:
+        return {"obs": [], "action": [], "reward": [], "done": [], "log_prob": []}
+
+    def is_storing(self, agent_idx: int) -> bool:
+        return len(self.rows[agent_idx]["obs"]) <= self.buffer_size
+
+    def next_idx(self, agent_idx: int) -> int:
+        return len(self.rows[agent_idx]["obs"])
+
+    def append(
+        self,
+        agent_idx: int,
+        obs: Tensor,
+        action: Tensor,
+        reward: float,
+        done: bool,
+        log_prob: float
+    ) -> None:
+        if not self.is_storing(agent_idx):
+            return
+        row: dict[str, list] = self.rows[agent_idx]
+        if 0 < len(row["obs"]):
+            row["reward"].append(float(reward))
+        row["obs"].append(obs.reshape(OBS_SHAPE))
+        if len(row["obs"]) == self.buffer_size + 1:
+            return
+        row["action"].append(action.reshape(ACTION_SHAPE))
+        row["done"].append(float(done))
+        row["log_prob"].append(float(log_prob))
+
+    def is_filled(self) -> bool:
+        return not all(self.is_storing(agent_idx) for agent_idx in range(len(self.rows)))
+
+    def get(self) -> tuple[Tensor]:
+        filled_indices: list[int] = [
+            agent_idx for agent_idx in range(len(self.rows)) if not self.is_storing(agent_idx)
+        ]
+        obs_stream: Tensor = torch.stack(
+            [torch.stack(self.rows[agent_idx]["obs"]) for agent_idx in filled_indices]
+        )
+        def to_tensor(name: str) -> Tensor:
+            return torch.tensor(
+                [self.rows[agent_idx][name] for agent_idx in filled_indices]
+            ).unsqueeze(-1)
+        actions: Tensor = torch.stack(
+            [torch.stack(self.rows[agent_idx]["action"]) for agent_idx in filled_indices]
+        )
+        rewards: Tensor = to_tensor("reward")
+        normed_rewards: Tensor = (rewards / (rewards.std() + 1e-06)).clamp(-5, 5)
+        experiences: tuple[Tensor] = (
+            obs_stream[:, :-1], actions, normed_rewards,
+            to_tensor("done"), to_tensor("log_prob"), obs_stream[:, 1:]
+        )
+        for agent_idx in filled_indices:
+            self.rows[agent_idx] = self._empty_row()
+        return experiences
+
+@pytest.mark.parametrize(
+    "buffer_kwargs", [{}, {"double_buffer": True}, {"memmap_threshold": 0}]
+)
+def test_get_matches_naive_buffer(buffer_kwargs: dict, tmp_path: Path) -> None:
+    if "memmap_threshold" in buffer_kwargs:
+        buffer_kwargs = {**buffer_kwargs, "memmap_dir": tmp_path}
+    rng: random.Random = random.Random(42)
+    torch.manual_seed(42)
+    buffer: RolloutBuffer4IPPO = RolloutBuffer4IPPO(
+        BUFFER_SIZE, NUM_AGENTS, OBS_SHAPE, ACTION_SHAPE, torch.device("cpu"), **buffer_kwargs
+    )
+    naive_buffer: NaiveRolloutBuffer = NaiveRolloutBuffer(BUFFER_SIZE, NUM_AGENTS)
+    num_gets: int = 0
+    for _ in range(500):
+        next_indices: set[int] = {naive_buffer.next_idx(agent_idx) for agent_idx in range(NUM_AGENTS)}
+        method: str = rng.choice(["append", "append_all_agents", "append_batch"])
+        if method == "append_all_agents" and (1 < len(next_indices) or naive_buffer.is_filled()):
+            method = "append_batch"
+        if method == "append":
+            agent_idx: int = rng.randrange(NUM_AGENTS)
+            obs: Tensor = torch.randn(1, *OBS_SHAPE)
+            action: Tensor = torch.randn(1, *ACTION_SHAPE)
+            reward, done, log_prob = rng.random(), rng.random() < 0.1, rng.random()
+            buffer.append(agent_idx, obs, action, reward, done, log_prob)
+            naive_buffer.append(agent_idx, obs, action, reward, done, log_prob)
+        else:
+            agent_indices: list[int] = (
+                list(range(NUM_AGENTS)) if method == "append_all_agents"
+                else rng.sample(range(NUM_AGENTS), rng.randint(1, NUM_AGENTS))
+            )
+            obses: Tensor = torch.randn(len(agent_indices), *OBS_SHAPE)
+            actions: Tensor = torch.randn(len(agent_indices), *ACTION_SHAPE)
+            rewards: ndarray = np.random.rand(len(agent_indices)).astype(np.float32)
+            dones: ndarray = (np.random.rand(len(agent_indices)) < 0.1).astype(np.float32)
+            log_probs: ndarray = np.random.rand(len(agent_indices)).astype(np.float32)
+            if method == "append_all_agents":
+                buffer.append_all_agents(obses, actions, rewards, dones, log_probs)
+            else:
+                buffer.append_batch(agent_indices, obses, actions, rewards, dones, log_probs)
+            for i, agent_idx in enumerate(agent_indices):
+                naive_buffer.append(
+                    agent_idx, obses[i], actions[i], rewards[i], dones[i], log_probs[i]
+                )
+        assert buffer.is_filled() == naive_buffer.is_filled()
+        if naive_buffer.is_filled():
+            expected_experiences: tuple[Tensor] = naive_buffer.get()
+            experiences: tuple[Tensor] = buffer.get()
+            for expected, actual in zip(expected_experiences, experiences):
+                assert expected.shape == actual.shape
+                assert torch.allclose(expected, actual, atol=1e-06)
+            num_gets += 1
+    buffer.close()
+    assert 0 < num_gets
+
+def test_get_is_not_overwritten_by_append() -> None:
+    buffer: RolloutBuffer4IPPO = RolloutBuffer4IPPO(
+        BUFFER_SIZE, NUM_AGENTS, OBS_SHAPE, ACTION_SHAPE, torch.device("cpu")
+    )
+    def append_all_agents() -> None:
+        buffer.append_all_agents(
+            torch.randn(NUM_AGENTS, *OBS_SHAPE), torch.randn(NUM_AGENTS, *ACTION_SHAPE),
+            np.random.rand(NUM_AGENTS), np.zeros(NUM_AGENTS), np.random.rand(NUM_AGENTS)
+        )
+    while not buffer.is_filled():
+        append_all_agents()
+    experiences: tuple[Tensor] = buffer.get()
+    cloned_experiences: list[Tensor] = [experience.clone() for experience in experiences]
+    for _ in range(BUFFER_SIZE):
+        append_all_agents()
+    for cloned, experience in zip(cloned_experiences, experiences):
+        assert torch.equal(cloned, experience)
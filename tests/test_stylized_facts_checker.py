@@ -0,0 +1,177 @@
+import numpy as np
+from numpy import ndarray
+import pandas as pd
+from pandas import DataFrame
+import pathlib
+from pathlib import Path
+curr_path: Path = pathlib.Path(__file__).resolve().parents[0]
+root_path: Path = curr_path.parents[0]
+import pytest
+from scipy.stats import kurtosis
+from scipy.stats import kurtosistest
+import sys
+sys.path.append(str(root_path))
+from stylized_facts import StylizedFactsChecker
+from typing import Optional
+
+@pytest.fixture
+def checker() -> StylizedFactsChecker:
+    return StylizedFactsChecker(seed=42)
+
+def test_calc_kurtosis_matches_scipy(checker: StylizedFactsChecker) -> None:
+    rng: np.random.Generator = np.random.default_rng(42)
+    return_arr: ndarray = rng.standard_t(df=4, size=(8, 300))
+    kurtosis_arr, pvalue_arr = checker._calc_kurtosis(return_arr)
+    assert kurtosis_arr.shape == (8, 1)
+    assert pvalue_arr.shape == (8, 1)
+    assert np.allclose(
+        kurtosis_arr, kurtosis(return_arr, axis=1, fisher=True, keepdims=True)
+    )
+    assert np.allclose(
+        pvalue_arr, kurtosistest(return_arr, axis=1, alternative="greater")[1][:,np.newaxis]
+    )
+
+def test_calc_kurtosis_requires_5_observations(checker: StylizedFactsChecker) -> None:
+    with pytest.raises(ValueError):
+        checker._calc_kurtosis(np.ones((2, 4)))
+
+def test_stack_dfs_follows_reassigned_ohlcv_dfs(checker: StylizedFactsChecker) -> None:
+    rng: np.random.Generator = np.random.default_rng(42)
+    def create_dfs() -> list[DataFrame]:
+        return [
+            DataFrame({"close": rng.random(10) + 1, "volume": rng.integers(1, 9, 10)})
+            for _ in range(3)
+        ]
+    checker.ohlcv_dfs = create_dfs()
+    volume_arr: ndarray = checker._stack_dfs(checker.ohlcv_dfs, "volume")
+    assert volume_arr.dtype == checker.ohlcv_dfs[0]["volume"].dtype
+    assert volume_arr is checker._stack_dfs(checker.ohlcv_dfs, "volume")
+    checker.ohlcv_dfs = create_dfs()
+    assert np.array_equal(
+        checker._stack_dfs(checker.ohlcv_dfs, "close"),
+        np.stack([df["close"].to_numpy() for df in checker.ohlcv_dfs])
+    )
+    checker.ohlcv_dfs[1] = checker.ohlcv_dfs[1] * 2
+    assert np.array_equal(
+        checker._stack_dfs(checker.ohlcv_dfs, "close"),
+        np.stack([df["close"].to_numpy() for df in checker.ohlcv_dfs])
+    )
+
+def resample_art_per_session_reference(
+    df: DataFrame,
+    cumsum_scaled_transactions_arr: ndarray,
+    resample_mid: bool
+) -> DataFrame:
+    """reference implementation resampling tick data bin by bin."""
+    cumsum_transactions: list[int] = list((len(df) * cumsum_scaled_transactions_arr).astype(int))
+    price_column: str = "mid_price" if resample_mid else "market_price"
+    rows: list[dict[str, Optional[float]]] = []
+    num_pre_transactions: int = 0
+    for num_cur_transactions in cumsum_transactions:
+        cur_df: DataFrame = df.iloc[num_pre_transactions:num_cur_transactions,:]
+        if 0 < len(cur_df):
+            rows.append(
+                {
+                    "open": cur_df[price_column].iloc[0], "high": cur_df[price_column].max(),
+                    "low": cur_df[price_column].min(), "close": cur_df[price_column].iloc[-1],
+                    "volume": cur_df["event_volume"].sum(), "num_events": len(cur_df),
+                    "mood": cur_df["mood"].mean(), "wc_rate": cur_df["wc_rate"].median(),
+                    "time_window_size": cur_df["time_window_size"].median()
+                }
+            )
+        else:
+            rows.append(
+                {
+                    "open": None, "high": None, "low": None, "close": None,
+                    "volume": 0, "num_events": 0,
+                    "mood": None, "wc_rate": None, "time_window_size": None
+                }
+            )
+        num_pre_transactions = num_cur_transactions
+    resampled_df: DataFrame = DataFrame(rows).astype(float)
+    for colname in ["close", "mood", "wc_rate", "time_window_size"]:
+        resampled_df[colname] = resampled_df[colname].ffill().bfill()
+    return resampled_df
+
+@pytest.mark.parametrize("resample_mid", [False, True])
+def test_resample_art_per_session_matches_loop(resample_mid: bool, tmp_path: Path) -> None:
+    rng: np.random.Generator = np.random.default_rng(42)
+    num_bins: int = 150
+    increment_arr: ndarray = rng.random(num_bins) * (0.3 < rng.random(num_bins))
+    cumsum_scaled_transactions_arr: ndarray = np.cumsum(increment_arr) / np.sum(increment_arr)
+    DataFrame(
+        {"transactions": cumsum_scaled_transactions_arr},
+        index=[f"{9+i//60:02d}:{i%60:02d}:00" for i in range(num_bins)]
+    ).to_csv(tmp_path / "transactions.csv")
+    checker: StylizedFactsChecker = StylizedFactsChecker(
+        seed=42, is_real=False, transactions_folder_path=tmp_path,
+        session1_transactions_file_name="transactions.csv"
+    )
+    for num_ticks in [10, 1000, 3000]:
+        mood_arr: ndarray = rng.random(num_ticks)
+        mood_arr[rng.random(num_ticks) < 0.2] = np.nan
+        df: DataFrame = DataFrame(
+            {
+                "market_price": rng.random(num_ticks) + 1,
+                "mid_price": rng.random(num_ticks) + 1,
+                "event_volume": rng.integers(1, 9, num_ticks),
+                "mood": mood_arr,
+                "wc_rate": rng.random(num_ticks),
+                "time_window_size": rng.integers(1, 100, num_ticks)
+            }
+        )
+        resampled_df: DataFrame = checker._resample_art_per_session(
+            df, "transactions.csv", resample_mid
+        )
+        expected_df: DataFrame = resample_art_per_session_reference(
+            df, cumsum_scaled_transactions_arr, resample_mid
+        )
+        assert len(resampled_df) == num_bins
+        pd.testing.assert_frame_equal(
+            resampled_df.reset_index(drop=True)[expected_df.columns], expected_df,
+            check_dtype=False
+        )
+
+def calc_autocorrelation_reference(
+    abs_return_arr: ndarray,
+    lags: list[int],
+    keepdim: bool
+) -> ndarray:
+    """reference implementation calculating autocorrelations lag by lag."""
+    axis: Optional[int] = 1 if keepdim else None
+    abs_mean: float | ndarray = np.mean(abs_return_arr, axis=axis, keepdims=keepdim)
+    var: float | ndarray = np.var(abs_return_arr, axis=axis, keepdims=keepdim)
+    acorrs: list[ndarray] = [
+        np.mean(
+            (abs_return_arr[:,lag:]-abs_mean)*(abs_return_arr[:,:-lag]-abs_mean),
+            axis=axis, keepdims=keepdim
+        ) / (var + 1e-10) for lag in lags
+    ]
+    return np.concatenate(acorrs, axis=1) if keepdim else np.array(acorrs)[np.newaxis,:]
+
+@pytest.mark.parametrize("keepdim", [True, False])
+def test_calc_autocorrelation_matches_lag_loop(checker: StylizedFactsChecker, keepdim: bool) -> None:
+    rng: np.random.Generator = np.random.default_rng(42)
+    abs_return_arr: ndarray = np.abs(rng.standard_t(df=4, size=(6, 500)))
+    lags: list[int] = list(range(1, 30))
+    acorr_arr: ndarray = checker._calc_autocorrelation(abs_return_arr, lags, keepdim=keepdim)
+    assert acorr_arr.shape == ((6 if keepdim else 1), len(lags))
+    assert np.allclose(
+        acorr_arr, calc_autocorrelation_reference(abs_return_arr, lags, keepdim), atol=1e-10
+    )
+
+def test_calc_autocorrelation_matches_corrcoef(checker: StylizedFactsChecker) -> None:
+    rng: np.random.Generator = np.random.default_rng(42)
+    # AR(1) series so that autocorrelations are far from zero.
+    noise_arr: ndarray = rng.standard_normal((3, 20000))
+    series_arr: ndarray = np.empty_like(noise_arr)
+    series_arr[:,0] = noise_arr[:,0]
+    for t in range(1, noise_arr.shape[1]):
+        series_arr[:,t] = 0.8 * series_arr[:,t-1] + noise_arr[:,t]
+    lags: list[int] = [1, 2, 5, 10]
+    acorr_arr: ndarray = checker._calc_autocorrelation(series_arr, lags)
+    for i, series in enumerate(series_arr):
+        for j, lag in enumerate(lags):
+            # the estimator uses the mean and variance of the whole series, which differs from
+            # pearson correlation of the shifted segments by O(lag / length).
+            assert abs(acorr_arr[i,j] - np.corrcoef(series[lag:], series[:-lag])[0,1]) < 5e-03